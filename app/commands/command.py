@@ -1,30 +1,49 @@
-import math
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
-import constants
+from constants import FRAMES
 
 
 class Command(ABC):
     """Abstract base class for robot commands with time-based execution."""
 
-    def __init__(self, time: float) -> None:
+    __slots__ = ('time', 'ticks', 'total_ticks')
+
+    def __init__(self, time: float, ticks: Optional[int] = None) -> None:
         """
         Initialize a command with execution time.
 
         Args:
             time: Duration in seconds for command execution
+            ticks: Number of frame ticks, if the subclass can compute it exactly.
+                Defaults to ceil(time * FRAMES).
         """
         self.time = time
 
         # Calculate number of frame ticks needed for this command
-        self.ticks = math.ceil(time * constants.FRAMES)
-        self.total_ticks = self.ticks
+        if ticks is None:
+            frames = time * FRAMES
+            ticks = int(frames)
+            if ticks < frames:
+                ticks += 1
+
+        self.ticks = ticks
+        self.total_ticks = ticks
 
     def tick(self) -> None:
         """Decrement the tick counter by one."""
         self.ticks -= 1
 
+    def apply_final(self, robot: Any) -> None:
+        """
+        Jump straight to this command's end state without simulating its ticks.
+
+        Args:
+            robot: The robot object to apply the command to
+        """
+        self.ticks = 0
+        self.apply_on_pos(robot.pos)
+
     @abstractmethod
     def process_one_tick(self, robot: Any) -> None:
         """
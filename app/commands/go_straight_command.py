@@ -1,10 +1,37 @@
-import constants
+from constants import FRAMES, GRID_LENGTH, ROBOT_SPEED_PER_SECOND
 from commands.command import Command
 from misc.direction import Direction
 from misc.positioning import Position
 
+# Unit (x, y) step for each facing direction, indexed by Direction
+_DIR_UNIT = (
+    (1, 0),  # Direction.RIGHT
+    (0, 1),  # Direction.TOP
+    (-1, 0),  # Direction.LEFT
+    (0, -1),  # Direction.BOTTOM
+)
+
+
+def _format_message(dist: float) -> str:
+    """Format a signed distance as an RPi straight-movement message."""
+    distance_cm = int(abs(dist))
+    direction_prefix = "BW" if dist < 0 else "FW"
+
+    # Zero-pad distances less than 100
+    if distance_cm < 100:
+        return f"{direction_prefix}0{distance_cm}"
+    else:
+        return f"{direction_prefix}{distance_cm}"
+
+
+# Pre-built messages for every distance that fits in the arena, indexed by distance in cm
+_FORWARD_MESSAGES = tuple(_format_message(d) for d in range(GRID_LENGTH + 1))
+_BACKWARD_MESSAGES = tuple(_format_message(-d) for d in range(GRID_LENGTH + 1))
+
 
 class StraightCommand(Command):
+    __slots__ = ('dist', '_distance_per_tick', '_message')
+
     def __init__(self, dist: float) -> None:
         """
         Initialize a straight movement command.
@@ -13,10 +40,20 @@ class StraightCommand(Command):
             dist: Distance to travel (already scaled, do not divide by scaling factor)
         """
         # Calculate the time needed to travel the required distance
-        time = abs(dist / constants.ROBOT_SPEED_PER_SECOND)
-        super().__init__(time)
+        time = abs(dist / ROBOT_SPEED_PER_SECOND)
+        # Integer ceil of |dist| * FRAMES / speed, without going through the float time
+        ticks = int(-(-abs(dist) * FRAMES // ROBOT_SPEED_PER_SECOND))
+        super().__init__(time, ticks)
         self.dist = dist
 
+        # Distance covered per frame tick is invariant for the lifetime of the command
+        self._distance_per_tick = dist / self.total_ticks if self.total_ticks else 0.0
+
+        # The RPi message is fully determined by the distance, so resolve it once
+        distance_cm = int(abs(dist))
+        messages = _BACKWARD_MESSAGES if dist < 0 else _FORWARD_MESSAGES
+        self._message = messages[distance_cm] if distance_cm < len(messages) else _format_message(dist)
+
     def __str__(self) -> str:
         return f"StraightCommand(dist={self.dist}, {self.total_ticks} ticks)"
 
@@ -28,15 +65,11 @@ class StraightCommand(Command):
 
         Used by AlgoSimulator to update the pygame simulator each time tick.
         """
-        if self.total_ticks == 0:
+        if self.ticks <= 0:
             return
 
-        # Calculate consistent distance per tick based on original values
-        original_ticks = abs(self.dist / constants.ROBOT_SPEED_PER_SECOND)
-        distance_per_tick = self.dist / original_ticks if original_ticks > 0 else 0
-
-        self.tick()  # Decrement remaining ticks
-        robot.straight(distance_per_tick)
+        self.ticks -= 1  # Inlined tick() to skip a method call per frame
+        robot.straight(self._distance_per_tick)
 
     def apply_on_pos(self, curr_pos: Position) -> Position:
         """
@@ -48,14 +81,9 @@ class StraightCommand(Command):
         Returns:
             The modified position object
         """
-        if curr_pos.direction == Direction.RIGHT:
-            curr_pos.x += self.dist
-        elif curr_pos.direction == Direction.TOP:
-            curr_pos.y += self.dist
-        elif curr_pos.direction == Direction.BOTTOM:
-            curr_pos.y -= self.dist
-        else:  # Direction.LEFT
-            curr_pos.x -= self.dist
+        unit_x, unit_y = _DIR_UNIT[curr_pos.direction]
+        curr_pos.x += unit_x * self.dist
+        curr_pos.y += unit_y * self.dist
 
         return curr_pos
 
@@ -64,14 +92,7 @@ class StraightCommand(Command):
         Convert command to message format for Raspberry Pi communication.
 
         Message format:
-        - Forward: SFXXX (where XXX is distance in cm, zero-padded if < 100)
-        - Backward: SBXXX (where XXX is absolute distance in cm, zero-padded if < 100)
+        - Forward: FWXXX (where XXX is distance in cm, zero-padded if < 100)
+        - Backward: BWXXX (where XXX is absolute distance in cm, zero-padded if < 100)
         """
-        distance_cm = int(abs(self.dist))
-        direction_prefix = "BW" if self.dist < 0 else "FW"
-
-        # Zero-pad distances less than 100
-        if distance_cm < 100:
-            return f"{direction_prefix}0{distance_cm}"
-        else:
-            return f"{direction_prefix}{distance_cm}"
\ No newline at end of file
+        return self._message
\ No newline at end of file
@@ -1,5 +1,8 @@
 from commands.command import Command
 
+# Pre-built scan messages for the obstacle ids the RPi can send, indexed by id
+_SCAN_MESSAGES = tuple(f"SCAN0{i}" for i in range(64))
+
 
 class ScanCommand(Command):
     """
@@ -10,6 +13,8 @@ class ScanCommand(Command):
         obj_index: The index of the object to scan
     """
 
+    __slots__ = ('obj_index',)
+
     def __init__(self, time, obj_index):
         super().__init__(time)
         self.obj_index = obj_index
@@ -26,6 +31,10 @@ class ScanCommand(Command):
 
         self.tick()
 
+    def apply_final(self, robot):
+        """Scanning never moves the robot, so finishing it is just a fast-forward of the ticks."""
+        self.ticks = 0
+
     def apply_on_pos(self, curr_pos):
         """
         Apply the scan command on the current position.
@@ -40,4 +49,6 @@ class ScanCommand(Command):
         Returns:
             str: Message in the format "SCAN_{obj_index}"
         """
+        if 0 <= self.obj_index < len(_SCAN_MESSAGES):
+            return _SCAN_MESSAGES[self.obj_index]
         return f"SCAN0{self.obj_index}"
\ No newline at end of file
@@ -0,0 +1,128 @@
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from commands.command import Command
+from misc.positioning import RobotPosition
+
+
+def _command_deltas(commands: Iterable[Command], start_pos: RobotPosition) -> Tuple[np.ndarray, ...]:
+    """
+    Walk the robot heading through a command sequence once and extract each command's effect.
+
+    Args:
+        commands: Commands to apply in order
+        start_pos: Position the first command is applied from
+
+    Returns:
+        Parallel arrays (dx, dy, direction_before, direction_after, ticks), one entry per command
+    """
+    commands = list(commands)
+    count = len(commands)
+
+    # Command deltas are whole centimetres on the grid
+    dx = np.zeros(count, dtype=np.int32)
+    dy = np.zeros(count, dtype=np.int32)
+    dir_before = np.empty(count, dtype=np.int8)
+    dir_after = np.empty(count, dtype=np.int8)
+    ticks = np.empty(count, dtype=np.int64)
+
+    direction = start_pos.direction
+    for i, command in enumerate(commands):
+        # Apply on a scratch position at the origin so the result is the pure delta
+        scratch = RobotPosition(0, 0, direction)
+        command.apply_on_pos(scratch)
+
+        dx[i] = scratch.x
+        dy[i] = scratch.y
+        dir_before[i] = direction
+        dir_after[i] = scratch.direction
+        ticks[i] = command.total_ticks
+
+        direction = scratch.direction
+
+    return dx, dy, dir_before, dir_after, ticks
+
+
+def simulate_trajectory(commands: Iterable[Command], start_pos: RobotPosition) -> np.ndarray:
+    """
+    Compute the per-frame robot trajectory for a command sequence in one vectorized pass.
+
+    Each command's displacement is spread evenly over its ticks and the heading
+    switches on a command's final tick, so the simulator can replay frames by
+    indexing instead of calling process_one_tick on every command each frame.
+
+    Args:
+        commands: Commands to simulate in order
+        start_pos: Starting robot position
+
+    Returns:
+        Array of shape (total_ticks + 1, 3) holding (x, y, direction) per frame.
+        Row 0 is the starting position.
+    """
+    dx, dy, dir_before, dir_after, ticks = _command_deltas(commands, start_pos)
+
+    # Commands with zero ticks still move the robot, so give them a single frame
+    frames_per_command = np.maximum(ticks, 1)
+    total_frames = int(frames_per_command.sum())
+
+    trajectory = np.empty((total_frames + 1, 3), dtype=np.float64)
+    trajectory[0] = (start_pos.x, start_pos.y, int(start_pos.direction))
+
+    # Interpolate from each command's exact start pose so every command ends on whole centimetres
+    end_frames = np.cumsum(frames_per_command)
+    command_of_frame = np.repeat(np.arange(len(ticks)), frames_per_command)
+    progress = (np.arange(1, total_frames + 1) - (end_frames - frames_per_command)[command_of_frame]) \
+        / frames_per_command[command_of_frame]
+
+    start_x = start_pos.x + np.cumsum(dx) - dx
+    start_y = start_pos.y + np.cumsum(dy) - dy
+    trajectory[1:, 0] = start_x[command_of_frame] + dx[command_of_frame] * progress
+    trajectory[1:, 1] = start_y[command_of_frame] + dy[command_of_frame] * progress
+
+    directions = np.repeat(dir_before, frames_per_command)
+    directions[end_frames - 1] = dir_after
+    trajectory[1:, 2] = directions
+
+    return trajectory
+
+
+def command_end_frames(commands: Iterable[Command]) -> np.ndarray:
+    """
+    Frame index in the simulate_trajectory output at which each command finishes.
+
+    Args:
+        commands: Commands in execution order
+
+    Returns:
+        Integer array with one cumulative frame index per command
+    """
+    ticks = np.fromiter((command.total_ticks for command in commands), dtype=np.int64)
+    # Matches simulate_trajectory, where zero-tick commands still occupy a single frame
+    return np.cumsum(np.maximum(ticks, 1))
+
+
+def apply_commands(commands: Iterable[Command], start_pos: RobotPosition) -> np.ndarray:
+    """
+    Roll a position forward through a command sequence, recording the pose after each command.
+
+    Equivalent to calling apply_on_pos on a copy of start_pos for each command in turn,
+    but the positions are accumulated with a single cumulative sum.
+
+    Args:
+        commands: Commands to apply in order
+        start_pos: Starting robot position
+
+    Returns:
+        Integer array of shape (len(commands) + 1, 3) holding (x, y, direction).
+        Row 0 is the starting position and row i is the pose after command i.
+    """
+    dx, dy, _, dir_after, _ = _command_deltas(commands, start_pos)
+
+    positions = np.empty((len(dx) + 1, 3), dtype=np.int32)
+    positions[0] = (start_pos.x, start_pos.y, int(start_pos.direction))
+    positions[1:, 0] = start_pos.x + np.cumsum(dx)
+    positions[1:, 1] = start_pos.y + np.cumsum(dy)
+    positions[1:, 2] = dir_after
+
+    return positions
@@ -1,46 +1,81 @@
+from itertools import product
 from typing import Dict, Tuple
 
+import constants
 from commands.command import Command
 from misc.direction import Direction
 from misc.positioning import Position, RobotPosition
 from misc.type_of_turn import TypeOfTurn
 
+# Returned for unknown turn configurations so no tuple is allocated per miss
+_ZERO_DELTA = (0, 0, None)
+_ZERO_DELTAS = (_ZERO_DELTA,) * len(Direction)
+
+
+def _pack_turn_key(left: bool, right: bool, reverse: bool) -> int:
+    """Pack a (left, right, reverse) turn configuration into a 3-bit table index."""
+    return (left << 2) | (right << 1) | reverse
+
+
+def _build_packed_deltas(deltas_by_key: Dict) -> Tuple:
+    """
+    Flatten a {(left, right, reverse): {direction: delta}} table into a tuple of 8
+    per-direction tuples, indexed by _pack_turn_key and then by Direction.
+    """
+    return tuple(
+        tuple(deltas_by_key[key][direction] for direction in Direction) if key in deltas_by_key else _ZERO_DELTAS
+        for key in product((False, True), repeat=3)
+    )
+
+
+def _build_packed_messages(messages: Dict, type_of_turn: TypeOfTurn) -> Tuple[str, ...]:
+    """Flatten the {(left, right, reverse, turn_type): message} table for one turn type, indexed by _pack_turn_key."""
+    return tuple(
+        messages.get(key + (type_of_turn,), "UNKNOWN_COMMAND")
+        for key in product((False, True), repeat=3)
+    )
+
 
 class TurnCommand(Command):
+    __slots__ = ('type_of_turn', 'left', 'right', 'reverse', '_deltas', '_message')
+
     # Time constants for turn type
     TURN_TIMES = {
         TypeOfTurn.MEDIUM: 30,  # SOME VALUE TO BE EMPIRICALLY DETERMINED
     }
 
-    # Position deltas for different turn combinations
+    # Position deltas for different turn combinations, sourced from the turning coordinates in constants
     MEDIUM_TURN_DELTAS = {
         # (left, right, reverse): {direction: (dx, dy, new_direction)}
         (True, False, False): {  # Left forward
-            Direction.TOP: (-20, 30, Direction.LEFT),
-            Direction.LEFT: (-30, -20, Direction.BOTTOM),
-            Direction.RIGHT: (30, 20, Direction.TOP),
-            Direction.BOTTOM: (20, -30, Direction.RIGHT),
+            Direction.TOP: (*constants.TURN_MED_LEFT_TOP_FORWARD, Direction.LEFT),
+            Direction.LEFT: (*constants.TURN_MED_LEFT_LEFT_FORWARD, Direction.BOTTOM),
+            Direction.RIGHT: (*constants.TURN_MED_LEFT_RIGHT_FORWARD, Direction.TOP),
+            Direction.BOTTOM: (*constants.TURN_MED_LEFT_BOTTOM_FORWARD, Direction.RIGHT),
         },
         (False, True, False): {  # Right forward
-            Direction.TOP: (20, 30, Direction.RIGHT),
-            Direction.LEFT: (-30, 20, Direction.TOP),
-            Direction.RIGHT: (30, -20, Direction.BOTTOM),
-            Direction.BOTTOM: (-20, -30, Direction.LEFT),
+            Direction.TOP: (*constants.TURN_MED_RIGHT_TOP_FORWARD, Direction.RIGHT),
+            Direction.LEFT: (*constants.TURN_MED_RIGHT_LEFT_FORWARD, Direction.TOP),
+            Direction.RIGHT: (*constants.TURN_MED_RIGHT_RIGHT_FORWARD, Direction.BOTTOM),
+            Direction.BOTTOM: (*constants.TURN_MED_RIGHT_BOTTOM_FORWARD, Direction.LEFT),
         },
         (True, False, True): {  # Left reverse
-            Direction.TOP: (-30, -20, Direction.RIGHT),
-            Direction.LEFT: (20, -30, Direction.TOP),
-            Direction.RIGHT: (-20, 30, Direction.BOTTOM),
-            Direction.BOTTOM: (30, 20, Direction.LEFT),
+            Direction.TOP: (*constants.TURN_MED_LEFT_TOP_REVERSE, Direction.RIGHT),
+            Direction.LEFT: (*constants.TURN_MED_LEFT_LEFT_REVERSE, Direction.TOP),
+            Direction.RIGHT: (*constants.TURN_MED_LEFT_RIGHT_REVERSE, Direction.BOTTOM),
+            Direction.BOTTOM: (*constants.TURN_MED_LEFT_BOTTOM_REVERSE, Direction.LEFT),
         },
         (False, True, True): {  # Right reverse
-            Direction.TOP: (30, -20, Direction.LEFT),
-            Direction.LEFT: (20, 30, Direction.BOTTOM),
-            Direction.RIGHT: (-20, -30, Direction.TOP),
-            Direction.BOTTOM: (-30, 20, Direction.RIGHT),
+            Direction.TOP: (*constants.TURN_MED_RIGHT_TOP_REVERSE, Direction.LEFT),
+            Direction.LEFT: (*constants.TURN_MED_RIGHT_LEFT_REVERSE, Direction.BOTTOM),
+            Direction.RIGHT: (*constants.TURN_MED_RIGHT_RIGHT_REVERSE, Direction.TOP),
+            Direction.BOTTOM: (*constants.TURN_MED_RIGHT_BOTTOM_REVERSE, Direction.RIGHT),
         },
     }
 
+    # Read-only view of MEDIUM_TURN_DELTAS indexed by _pack_turn_key, then by Direction
+    _MEDIUM_DELTAS_BY_KEY = _build_packed_deltas(MEDIUM_TURN_DELTAS)
+
     # Command messages for different turn combinations
     COMMAND_MESSAGES = {
         # (left, right, reverse, turn_type): message
@@ -50,6 +85,9 @@ class TurnCommand(Command):
         (False, True, True, TypeOfTurn.MEDIUM): "RB090",  # turn right medium reverse
     }
 
+    # COMMAND_MESSAGES for medium turns indexed by _pack_turn_key
+    _MEDIUM_MESSAGES_BY_KEY = _build_packed_messages(COMMAND_MESSAGES, TypeOfTurn.MEDIUM)
+
     def __init__(self, type_of_turn: TypeOfTurn, left: bool, right: bool, reverse: bool):
         """
         Initialize a turn command.
@@ -68,6 +106,15 @@ class TurnCommand(Command):
         self.right = right
         self.reverse = reverse
 
+        # Resolve the delta row and message once from the packed key; no tuple key is built per command
+        if type_of_turn is TypeOfTurn.MEDIUM:
+            turn_key = _pack_turn_key(left, right, reverse)
+            self._deltas = self._MEDIUM_DELTAS_BY_KEY[turn_key]
+            self._message = self._MEDIUM_MESSAGES_BY_KEY[turn_key]
+        else:
+            self._deltas = _ZERO_DELTAS
+            self._message = "UNKNOWN_COMMAND"
+
     def __str__(self) -> str:
         return f"TurnCommand:{self.type_of_turn}, rev={self.reverse}, left={self.left}, right={self.right})"
 
@@ -95,9 +142,7 @@ class TurnCommand(Command):
         Returns:
             Tuple of (dx, dy, new_direction). new_direction is None if unchanged.
         """
-        turn_key = (self.left, self.right, self.reverse)
-        deltas = self.MEDIUM_TURN_DELTAS
-        return deltas.get(turn_key, {}).get(direction, (0, 0, None))
+        return self._deltas[direction]
 
     def apply_on_pos(self, curr_pos: Position) -> 'TurnCommand':
         """
@@ -142,5 +187,4 @@ class TurnCommand(Command):
         #   MEDIUM: "RB090"  (turn right medium reverse)
         # If configuration is not recognized, returns "UNKNOWN_COMMAND".
         """
-        command_key = (self.left, self.right, self.reverse, self.type_of_turn)
-        return self.COMMAND_MESSAGES.get(command_key, "UNKNOWN_COMMAND")
\ No newline at end of file
+        return self._message
\ No newline at end of file
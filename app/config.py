@@ -0,0 +1,12 @@
+import functools
+
+import yaml
+
+CONFIG_PATH = "app/config.yaml"  # adjust path if config.yaml is elsewhere
+
+
+@functools.lru_cache(maxsize=None)
+def get_cfg() -> dict:
+    """Load and parse config.yaml on first use; every later caller shares the same dict."""
+    with open(CONFIG_PATH, "r") as f:
+        return yaml.safe_load(f)
@@ -1,3 +1,4 @@
+import functools
 import socket
 
 from misc.direction import Direction
@@ -20,10 +21,22 @@ RUN_SIMULATION = True  # Set true for simulation mode
 RPI_HOST: str = "192.168.47.1"
 RPI_PORT: int = 6000
 
-# Connection to PC
-PC_HOST: str = socket.gethostbyname(socket.gethostname())
+# Connection to PC (PC_HOST is resolved lazily, see get_pc_host)
 PC_PORT: int = 4161
 
+
+@functools.lru_cache(maxsize=None)
+def get_pc_host() -> str:
+    """Resolve this PC's IP address on first use rather than blocking on DNS at import."""
+    return socket.gethostbyname(socket.gethostname())
+
+
+def __getattr__(name: str):
+    # Keep `constants.PC_HOST` working for existing callers
+    if name == "PC_HOST":
+        return get_pc_host()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # =============================================================================
 # ROBOT CONFIGURATION
 # =============================================================================
@@ -139,6 +152,7 @@ YELLOW = (255, 255, 18)
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
 GREY = (163, 163, 194)
+LIGHT_GRAY = (211, 211, 211)
 DARK_GRAY = (169, 169, 169)
 DARKER_GRAY = (80, 80, 100)
 SILVER = (192, 192, 192)
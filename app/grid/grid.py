@@ -1,7 +1,10 @@
 import math
-from collections import deque
-from typing import List, Optional
+import threading
+from collections import OrderedDict, defaultdict
+from functools import cached_property, lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pygame
 
 import constants
@@ -9,6 +12,58 @@ from grid.grid_cell import GridCell
 from grid.obstacle import Obstacle
 from misc.positioning import Position
 
+# Loaded on first use because pygame.freetype must be initialised before creating fonts
+_LABEL_FONT = None
+
+
+def _get_label_font():
+    """Return the shared font used for coordinate labels."""
+    global _LABEL_FONT
+    if _LABEL_FONT is None:
+        _LABEL_FONT = pygame.freetype.SysFont(None, 18)
+        _LABEL_FONT.origin = True
+    return _LABEL_FONT
+
+
+# Occupancy arrays keyed by (obstacle layout, rows, cols), keeping only the most recently used
+# layouts as the server sees a new one for every run
+_GRID_CACHE_SIZE = 32
+_GRID_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+# Grids are built from path requests running in worker threads
+_GRID_CACHE_LOCK = threading.Lock()
+
+
+def clear_cache() -> None:
+    """Drop all cached grid occupancy arrays."""
+    with _GRID_CACHE_LOCK:
+        _GRID_CACHE.clear()
+
+
+@lru_cache(maxsize=None)
+def _boundary_mask(rows: int, cols: int) -> np.ndarray:
+    """
+    Cells that lie within the arena boundaries (see Grid._is_within_boundaries).
+
+    The boundary never changes, so the mask is built once per grid shape and shared.
+
+    Args:
+        rows: Number of rows in the grid
+        cols: Number of columns in the grid
+
+    Returns:
+        np.ndarray: Read-only (rows, cols) bool array, True inside the boundaries
+    """
+    cell = constants.GRID_CELL_LENGTH
+    mask = np.zeros((rows, cols), dtype=bool)
+
+    # Ceil division gives the first index whose coordinate reaches each boundary
+    min_index = -(-constants.GRID_CELL_LENGTH // cell)
+    max_index = -(-(constants.GRID_LENGTH - constants.GRID_CELL_LENGTH) // cell)
+    mask[min_index:max_index, min_index:max_index] = True
+
+    mask.setflags(write=False)
+    return mask
+
 
 class Grid:
     """
@@ -18,6 +73,14 @@ class Grid:
     or free. Each cell has a fixed size defined by GRID_CELL_LENGTH.
     """
 
+    # Grid dimensions in cells; subclasses for other arenas override these
+    ROWS = constants.NO_OF_GRID_CELLS_PER_SIDE
+    COLS = constants.NO_OF_GRID_CELLS_PER_SIDE
+    BORDER_WIDTH = 1
+
+    # Pre-rendered coordinate labels, shared by all grids
+    _label_surfaces: Optional[List[Tuple[pygame.Surface, Tuple[int, int]]]] = None
+
     def __init__(self, obstacles: List[Obstacle]):
         """
         Initialize the grid with obstacles.
@@ -26,52 +89,112 @@ class Grid:
             obstacles: List of Obstacle objects to place in the grid
         """
         self.obstacles = obstacles
-        self.gridcells = self._generate_grid(
-            constants.NO_OF_GRID_CELLS_PER_SIDE,
-            constants.NO_OF_GRID_CELLS_PER_SIDE
-        )
-        self.gridcells2 = self._generate_grid(
+        # Cells, borders and labels never change between frames, so they are rendered once
+        self._cached_background: Optional[pygame.Surface] = None
+        # Spatial hash of obstacles by the cell containing their centre, so proximity
+        # checks only look at obstacles in nearby cells
+        self._hash: Dict[Tuple[int, int], List[Obstacle]] = defaultdict(list)
+        for obstacle in obstacles:
+            self._hash[self._cell_key(obstacle.position.x, obstacle.position.y)].append(obstacle)
+
+        # Occupancy is stored as (rows, cols) bool arrays indexed bottom-up, so [i, j]
+        # is the cell at x = j * GRID_CELL_LENGTH, y = i * GRID_CELL_LENGTH
+        self._layout_key = tuple(sorted(
+            (o.position.x, o.position.y, o.position.direction.value) for o in obstacles
+        ))
+        self.occupied = self._cached_occupancy(self.ROWS, self.COLS)
+
+    @property
+    def layout_key(self) -> tuple:
+        """Hashable description of the obstacle layout, equal for grids with the same obstacles."""
+        return self._layout_key
+
+    @cached_property
+    def occupied2(self) -> np.ndarray:
+        """Occupancy of the task 2 grid, only generated when first used."""
+        return self._cached_occupancy(
             constants.TASK2_LENGTH // constants.GRID_CELL_LENGTH,
             constants.TASK2_WIDTH // constants.GRID_CELL_LENGTH
         )
 
-    def _generate_grid(self, rows: int, cols: int) -> deque:
+    def _cached_occupancy(self, rows: int, cols: int) -> np.ndarray:
+        """
+        Get the occupancy array for this obstacle layout, generating it on first use.
+
+        Args:
+            rows: Number of rows in the grid
+            cols: Number of columns in the grid
+
+        Returns:
+            np.ndarray: A private copy of the cached occupancy array
+        """
+        key = (self._layout_key, rows, cols)
+        with _GRID_CACHE_LOCK:
+            cached = _GRID_CACHE.get(key)
+            if cached is not None:
+                _GRID_CACHE.move_to_end(key)
+
+        if cached is None:
+            cached = self._generate_occupancy(rows, cols)
+            with _GRID_CACHE_LOCK:
+                _GRID_CACHE[key] = cached
+                if len(_GRID_CACHE) > _GRID_CACHE_SIZE:
+                    _GRID_CACHE.popitem(last=False)
+
+        # Copy so that callers mutating their grid cannot corrupt the cache
+        return cached.copy()
+
+    def _generate_occupancy(self, rows: int, cols: int) -> np.ndarray:
         """
-        Generate grid cells for the specified dimensions.
+        Compute which cells are blocked by obstacles or the arena boundary.
 
-        Cells that fall within the safety distance of obstacles are marked as occupied.
-        The grid uses a coordinate system where grid[0] refers to the top row.
+        Equivalent to evaluating _is_valid_position at every cell, but the boundary comes
+        from a shared precomputed mask and each obstacle's safety square is written with
+        a slice assignment.
 
         Args:
             rows: Number of rows in the grid
             cols: Number of columns in the grid
 
         Returns:
-            deque: 2D grid structure containing GridCell objects
+            np.ndarray: (rows, cols) bool array where [i, j] is the cell at
+            x = j * GRID_CELL_LENGTH, y = i * GRID_CELL_LENGTH
         """
-        grid = deque()
+        cell = constants.GRID_CELL_LENGTH
+        # Everything outside the arena boundaries starts out blocked
+        occupancy = ~_boundary_mask(rows, cols)
+
+        # A cell is inside an obstacle's zone if any cell of its 3x3 neighbourhood is within
+        # OBSTACLE_SAFETY_WIDTH of the obstacle (see Obstacle.check_within_boundary)
+        reach = (constants.OBSTACLE_SAFETY_WIDTH + cell) // cell
+        for obstacle in self.obstacles:
+            col = obstacle.position.x // cell
+            row = obstacle.position.y // cell
+            occupancy[max(0, row - reach):row + reach + 1, max(0, col - reach):col + reach + 1] = True
 
-        for i in range(rows):
-            row = deque()
-            for j in range(cols):
-                x = constants.GRID_CELL_LENGTH * j
-                y = constants.GRID_CELL_LENGTH * i
-                position = Position(x, y)
-                is_occupied = not self._is_valid_position(position)
+        return occupancy
 
-                cell = GridCell(position, is_occupied)
-                row.append(cell)
+    def valid_cells(self, ignore_obstacles: bool = False) -> np.ndarray:
+        """
+        Cells whose coordinate is a valid robot position, as check_valid_position reports it.
 
-            # Insert at the beginning to maintain coordinate system
-            # where grid[0] refers to the last row from bottom
-            grid.appendleft(row)
+        Args:
+            ignore_obstacles: If True, only the arena boundaries are taken into account
 
-        return grid
+        Returns:
+            np.ndarray: (rows, cols) bool array indexed like occupied, True where valid
+        """
+        if ignore_obstacles:
+            return _boundary_mask(*self.occupied.shape)
+        return ~self.occupied
 
     def get_cell_at_coordinate(self, x: float, y: float) -> Optional[GridCell]:
         """
         Get the GridCell at the specified coordinates.
 
+        Cells are not stored individually; the GridCell is built on demand from the
+        occupancy array.
+
         Args:
             x: X coordinate in grid units
             y: Y coordinate in grid units
@@ -80,45 +203,32 @@ class Grid:
             GridCell at the specified coordinates, or None if out of bounds
         """
         col = math.floor(x / constants.GRID_CELL_LENGTH)
-        row = (
-                constants.NO_OF_GRID_CELLS_PER_SIDE
-                - math.floor(y / constants.GRID_CELL_LENGTH)
-                - 1
-        )
+        row = math.floor(y / constants.GRID_CELL_LENGTH)
 
-        try:
-            return self.gridcells[row][col]
-        except IndexError:
+        rows, cols = self.occupied.shape
+        if not (0 <= row < rows and 0 <= col < cols):
             return None
+        return self._cell_at_index(row, col)
+
+    def _cell_at_index(self, row: int, col: int) -> GridCell:
+        """Build the GridCell for an index into the occupancy array."""
+        position = Position(constants.GRID_CELL_LENGTH * col, constants.GRID_CELL_LENGTH * row)
+        return GridCell(position, bool(self.occupied[row, col]))
 
     def copy(self) -> 'Grid':
         """
         Create a deep copy of the grid.
 
         Returns:
-            Grid: A new Grid instance with copied cells
+            Grid: A new Grid instance with copied occupancy
         """
-        new_grid = Grid(self.obstacles)
-        new_grid.gridcells = self._deep_copy_cells(self.gridcells)
-        new_grid.gridcells2 = self._deep_copy_cells(self.gridcells2)
+        # The constructor already hands the new grid its own copy of the cached occupancy
+        new_grid = type(self)(self.obstacles)
+        # Leave the task 2 grid lazy unless this grid has already built it
+        if 'occupied2' in self.__dict__:
+            new_grid.occupied2 = self.occupied2.copy()
         return new_grid
 
-    def _deep_copy_cells(self, cells: deque) -> List[List[GridCell]]:
-        """
-        Create a deep copy of the cell structure.
-
-        Args:
-            cells: Original cell structure to copy
-
-        Returns:
-            List of lists containing copied GridCell objects
-        """
-        copied_cells = []
-        for row in cells:
-            new_row = [cell.copy() for cell in row]
-            copied_cells.append(new_row)
-        return copied_cells
-
     def is_adjacent_to_obstacle(self, x: int, y: int, min_separation: int) -> bool:
         """
         Check if a position is too close to any obstacle.
@@ -133,9 +243,33 @@ class Grid:
         """
         return any(
             self._is_too_close_to_obstacle(obstacle, x, y, min_separation)
-            for obstacle in self.obstacles
+            for obstacle in self._candidates(x, y, min_separation + 1)
         )
 
+    @staticmethod
+    def _cell_key(x: float, y: float) -> Tuple[int, int]:
+        """Spatial hash key of the cell containing a coordinate."""
+        return int(x // constants.GRID_CELL_LENGTH), int(y // constants.GRID_CELL_LENGTH)
+
+    def _candidates(self, x: float, y: float, reach: float) -> Iterator[Obstacle]:
+        """
+        Yield the obstacles whose centre may lie within reach of a coordinate.
+
+        Args:
+            x: X coordinate
+            y: Y coordinate
+            reach: Distance along each axis beyond which obstacles are skipped
+
+        Yields:
+            Obstacles from the hash cells overlapping the reach square
+        """
+        k = math.ceil(reach / constants.GRID_CELL_LENGTH)
+        cell_x, cell_y = self._cell_key(x, y)
+        for i in range(cell_x - k, cell_x + k + 1):
+            for j in range(cell_y - k, cell_y + k + 1):
+                # get() rather than [] so lookups don't insert empty cells into the defaultdict
+                yield from self._hash.get((i, j), ())
+
     def _is_too_close_to_obstacle(self, obstacle: Obstacle, x: int, y: int,
                                   min_separation: int) -> bool:
         """
@@ -177,9 +311,11 @@ class Grid:
 
     def _is_position_in_obstacle(self, position: Position) -> bool:
         """Check if position intersects with any obstacle."""
+        # In full 3x3 mode only obstacles within one cell plus the safety width can match
+        reach = constants.OBSTACLE_SAFETY_WIDTH + constants.GRID_CELL_LENGTH + 1
         return any(
             obstacle.check_within_boundary(position, False)
-            for obstacle in self.obstacles
+            for obstacle in self._candidates(position.x, position.y, reach)
         )
 
     def _is_within_boundaries(self, position: Position) -> bool:
@@ -197,58 +333,63 @@ class Grid:
         """
         Draw the complete grid including nodes, borders, and obstacles.
 
+        The static background (nodes, borders and labels) is rendered to an off-screen
+        surface on the first call and blitted on later calls.
+
         Args:
             screen: Pygame screen surface to draw on
         """
-        self._draw_nodes(screen)
-        self._draw_arena_borders(screen)
+        if self._cached_background is None or self._cached_background.get_size() != screen.get_size():
+            self._cached_background = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            self._draw_nodes(self._cached_background)
+            self._draw_arena_borders(self._cached_background)
+
+        screen.blit(self._cached_background, (0, 0))
         self._draw_obstacles(screen)
 
+    def invalidate_background(self) -> None:
+        """Force the static background to be re-rendered, e.g. after changing obstacles."""
+        self._cached_background = None
+
     def _draw_nodes(self, screen) -> None:
         """Draw all grid cells."""
-        for row in self.gridcells:
-            for cell in row:
-                cell.draw(screen)
+        rows, cols = self.occupied.shape
+        # Top row first, matching the screen layout
+        for row in reversed(range(rows)):
+            for col in range(cols):
+                self._cell_at_index(row, col).draw(screen)
 
     def _draw_obstacles(self, screen) -> None:
         """Draw all obstacles."""
         for obstacle in self.obstacles:
             obstacle.draw(screen)
 
-    @staticmethod
-    def _draw_arena_borders(screen) -> None:
+    @classmethod
+    def _draw_arena_borders(cls, screen) -> None:
         """
         Draw the arena borders and grid lines.
 
         Args:
             screen: Pygame screen surface to draw on
         """
-        Grid._draw_grid_lines(screen)
-        Grid._draw_boundary_lines(screen)
-        Grid._draw_grid_labels(screen)
+        cls._draw_grid_lines(screen)
+        cls._draw_boundary_lines(screen)
+        cls._draw_grid_labels(screen)
 
     @staticmethod
     def _draw_grid_lines(screen) -> None:
         """Draw internal grid lines."""
-        for i in range(1, constants.NO_OF_GRID_CELLS_PER_SIDE):
-            if i % 5 == 0:  # Draw thicker lines every 5 cells
-                y_pos = i * constants.GRID_CELL_LENGTH
-                x_pos = i * constants.GRID_CELL_LENGTH
-
-                # Horizontal line
-                pygame.draw.line(
-                    screen, constants.DARK_GRAY,
-                    (0, y_pos), (constants.GRID_LENGTH, y_pos)
-                )
-
-                # Vertical line
-                pygame.draw.line(
-                    screen, constants.DARK_GRAY,
-                    (x_pos, 0), (x_pos, constants.GRID_LENGTH)
-                )
-
-    @staticmethod
-    def _draw_boundary_lines(screen) -> None:
+        # Axis-aligned 1px lines are plain rectangle fills, which are cheaper than line
+        # primitives. The strips span GRID_LENGTH + 1 pixels, like the inclusive end point
+        # of pygame.draw.line.
+        length = constants.GRID_LENGTH + 1
+        for i in range(5, constants.NO_OF_GRID_CELLS_PER_SIDE, 5):  # Every 5 cells
+            pos = i * constants.GRID_CELL_LENGTH
+            screen.fill(constants.DARK_GRAY, (0, pos, length, 1))  # Horizontal line
+            screen.fill(constants.DARK_GRAY, (pos, 0, 1, length))  # Vertical line
+
+    @classmethod
+    def _draw_boundary_lines(cls, screen) -> None:
         """Draw the outer boundary of the arena."""
         grid_length = constants.GRID_LENGTH
 
@@ -261,25 +402,41 @@ class Grid:
         ]
 
         for start_pos, end_pos in border_lines:
-            pygame.draw.line(screen, constants.RED, start_pos, end_pos)
+            pygame.draw.line(screen, constants.RED, start_pos, end_pos, cls.BORDER_WIDTH)
+
+    @staticmethod
+    def _get_label_surfaces() -> List[Tuple[pygame.Surface, Tuple[int, int]]]:
+        """
+        Rasterize the coordinate labels once and reuse them on every draw.
+
+        Returns:
+            (surface, offset) per label, where offset moves a baseline origin to the
+            surface's top-left corner
+        """
+        if Grid._label_surfaces is None:
+            font = _get_label_font()
+            Grid._label_surfaces = []
+            for i in range(constants.NO_OF_GRID_CELLS_PER_SIDE):
+                surface, rect = font.render(f"{i}", pygame.Color("DarkBlue"))
+                Grid._label_surfaces.append((surface, (rect.x, -rect.y)))
+        return Grid._label_surfaces
 
     @staticmethod
     def _draw_grid_labels(screen) -> None:
         """Draw coordinate labels on the grid."""
-        font = pygame.freetype.SysFont(None, 18)
-        font.origin = True
+        labels = Grid._get_label_surfaces()
 
         # Draw column numbers (bottom)
-        for i in range(constants.NO_OF_GRID_CELLS_PER_SIDE):
+        for i, (surface, (offset_x, offset_y)) in enumerate(labels):
             x_pos = i * constants.GRID_CELL_LENGTH + 8
             y_pos = constants.GRID_LENGTH + 25
-            font.render_to(screen, (x_pos, y_pos), f"{i}", pygame.Color("DarkBlue"))
+            screen.blit(surface, (x_pos + offset_x, y_pos + offset_y))
 
         # Draw row numbers (right side)
-        for j in range(constants.NO_OF_GRID_CELLS_PER_SIDE):
+        for j, (surface, (offset_x, offset_y)) in enumerate(labels):
             x_pos = constants.GRID_LENGTH + 10
             y_pos = constants.GRID_LENGTH - j * constants.GRID_CELL_LENGTH - 8
-            font.render_to(screen, (x_pos, y_pos), f"{j}", pygame.Color("DarkBlue"))
+            screen.blit(surface, (x_pos + offset_x, y_pos + offset_y))
 
     # Public API methods for backwards compatibility
     def check_valid_position(self, position: Position, yolo: bool = False) -> bool:
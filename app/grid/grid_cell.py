@@ -6,6 +6,8 @@ from typing import Optional
 class GridCell:
     """Represents a cell in a grid with position and occupancy status."""
 
+    __slots__ = ('position', 'occupied')
+
     def __init__(self, position: Position, occupied: bool) -> None:
         self.position = position
         self.occupied = occupied
@@ -1,10 +1,90 @@
 import pygame
-from typing import List, Tuple
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 import constants
 from misc.direction import Direction
 from misc.positioning import Position, RobotPosition
 
+# Obstacles in an arena corner, keyed by centre coordinates
+_CORNERS = {
+    (0, 0): "bottom_left",
+    (0, 190): "top_left",
+    (190, 190): "top_right",
+    (190, 0): "bottom_right"
+}
+
+# Obstacles along an arena edge, keyed by the coordinate on that edge. Rows are checked first.
+_EDGES_BY_Y = {0: "bottom", 190: "top"}
+_EDGES_BY_X = {0: "left", 190: "right"}
+
+
+def _edge_type_at(x: int, y: int) -> Optional[str]:
+    """Return the arena edge an obstacle centre lies on, if any."""
+    edge_type = _EDGES_BY_Y.get(y)
+    return edge_type if edge_type is not None else _EDGES_BY_X.get(x)
+
+
+def _nearest_offset_distance(diff: float, cell_len: int) -> float:
+    """Smallest of |diff - offset| over the neighbourhood offsets -cell_len, 0 and cell_len."""
+    return min(abs(diff), abs(diff - cell_len), abs(diff + cell_len))
+
+
+def _within_boundary(obs_x: float, obs_y: float, px: float, py: float, mode: int,
+                     cell_len: int, safety: int) -> bool:
+    """
+    Check whether a position's neighbourhood touches an obstacle's safety zone.
+
+    The neighbourhood is separable per axis, so rather than testing each of the
+    neighbouring cells in turn the closest offset along x and y is used directly.
+
+    Args:
+        obs_x, obs_y: Obstacle centre
+        px, py: Position being checked
+        mode: 1 for cross pattern, 2 for single cell, anything else for full 3x3
+        cell_len: Neighbourhood spacing (GRID_CELL_LENGTH)
+        safety: Safety half-width around the obstacle (OBSTACLE_SAFETY_WIDTH)
+
+    Returns:
+        True if any checked cell lies inside the safety zone
+    """
+    limit = safety + 1
+    diff_x = obs_x - px
+    diff_y = obs_y - py
+
+    if mode == 2:  # Single cell
+        return abs(diff_x) < limit and abs(diff_y) < limit
+
+    near_x = _nearest_offset_distance(diff_x, cell_len) < limit
+    near_y = _nearest_offset_distance(diff_y, cell_len) < limit
+    if mode == 1:  # Cross pattern
+        return (near_x and abs(diff_y) < limit) or (abs(diff_x) < limit and near_y)
+    return near_x and near_y  # Full 3x3 grid
+
+
+# Nudges to the standard target so the robot keeps clear of the arena walls
+_CORNER_ADJUSTMENTS = {
+    "bottom_left": {Direction.TOP: (10, 0), Direction.RIGHT: (0, 10)},
+    "top_left": {Direction.BOTTOM: (10, 0), Direction.RIGHT: (0, -10)},
+    "top_right": {Direction.BOTTOM: (-10, 0), Direction.LEFT: (0, -10)},
+    "bottom_right": {Direction.TOP: (-10, 0), Direction.LEFT: (0, 10)}
+}
+
+_EDGE_ADJUSTMENTS = {
+    "bottom": {Direction.LEFT: (0, 10), Direction.RIGHT: (0, 10)},
+    "top": {Direction.LEFT: (0, -10), Direction.RIGHT: (0, -10)},
+    "left": {Direction.TOP: (10, 0), Direction.BOTTOM: (10, 0)},
+    "right": {Direction.TOP: (-10, 0), Direction.BOTTOM: (-10, 0)}
+}
+
+# Obstacle face -> (unit offset of the robot from the obstacle, robot facing direction)
+_DIRECTION_TARGETS = {
+    Direction.TOP: ((0, 1), Direction.BOTTOM),
+    Direction.BOTTOM: ((0, -1), Direction.TOP),
+    Direction.LEFT: ((-1, 0), Direction.RIGHT),
+    Direction.RIGHT: ((1, 0), Direction.LEFT)
+}
+
 
 class Obstacle:
     """
@@ -29,8 +109,15 @@ class Obstacle:
 
         self.position = position
         self.index = index
+        # Position never changes after construction, so classify it against the arena once
+        self._corner_type = _CORNERS.get((position.x, position.y))
+        self._edge_type = _edge_type_at(position.x, position.y) if self._corner_type is None else None
         self.target_position = self._calculate_robot_target_position()
 
+        # Obstacles never move, so the safety boundary is projected to screen space once
+        self._boundary_points = self.get_boundary_points()
+        self._boundary_lines_pygame = self._project_boundary_lines(self._boundary_points)
+
     def _validate_position(self, position: Position) -> None:
         """Validate that obstacle coordinates are centered in grid cells."""
         if position.x % 10 != 0 or position.y % 10 != 0:
@@ -41,7 +128,7 @@ class Obstacle:
 
     __repr__ = __str__
 
-    def check_within_boundary(self, position: Position, collision_mode: int) -> bool:
+    def check_within_boundary(self, position: Position, collision_mode: int = 0) -> bool:
         """
         Check if a position is within the safety boundary of this obstacle.
 
@@ -52,43 +139,10 @@ class Obstacle:
         Returns:
             True if position is within the safety boundary
         """
-        check_positions = self._get_positions_to_check(position, collision_mode)
-
-        for check_pos in check_positions:
-            if self._is_position_in_safety_zone(check_pos):
-                return True
-
-        return False
-
-    def _get_positions_to_check(self, position: Position, collision_mode: int) -> List[Tuple[int, int]]:
-        """Get list of positions to check based on collision mode."""
-        base_positions = [
-            (position.x - constants.GRID_CELL_LENGTH, position.y - constants.GRID_CELL_LENGTH),
-            (position.x - constants.GRID_CELL_LENGTH, position.y),
-            (position.x - constants.GRID_CELL_LENGTH, position.y + constants.GRID_CELL_LENGTH),
-            (position.x, position.y - constants.GRID_CELL_LENGTH),
-            (position.x, position.y),
-            (position.x, position.y + constants.GRID_CELL_LENGTH),
-            (position.x + constants.GRID_CELL_LENGTH, position.y - constants.GRID_CELL_LENGTH),
-            (position.x + constants.GRID_CELL_LENGTH, position.y),
-            (position.x + constants.GRID_CELL_LENGTH, position.y + constants.GRID_CELL_LENGTH)
-        ]
-
-        if collision_mode == 1:  # Cross pattern
-            return [(x, y) for x, y in base_positions if position.x == x or position.y == y]
-        elif collision_mode == 2:  # Single cell
-            return [(position.x, position.y)]
-        else:  # Full 3x3 grid
-            return base_positions
-
-    def _is_position_in_safety_zone(self, check_position: Tuple[int, int]) -> bool:
-        """Check if a single position is within the obstacle's safety zone."""
-        x, y = check_position
-        diff_x = abs(self.position.x - x)
-        diff_y = abs(self.position.y - y)
-
-        return (diff_y < constants.OBSTACLE_SAFETY_WIDTH + 1 and
-                diff_x < constants.OBSTACLE_SAFETY_WIDTH + 1)
+        return _within_boundary(
+            self.position.x, self.position.y, position.x, position.y, collision_mode,
+            constants.GRID_CELL_LENGTH, constants.OBSTACLE_SAFETY_WIDTH
+        )
 
     def get_boundary_points(self) -> List[Position]:
         """
@@ -108,99 +162,40 @@ class Obstacle:
 
     def _calculate_robot_target_position(self) -> RobotPosition:
         """Calculate the target position for the robot to approach this obstacle."""
-        corner_type = self._get_corner_type()
-        edge_type = self._get_edge_type() if corner_type is None else None
-
-        if corner_type:
-            return self._get_corner_target_position(corner_type)
-        elif edge_type:
-            return self._get_edge_target_position(edge_type)
-        else:
-            return self._get_standard_target_position()
-
-    def _get_corner_type(self) -> str:
-        """Determine if obstacle is at a corner and return corner type."""
-        corners = {
-            (0, 0): "bottom_left",
-            (0, 190): "top_left",
-            (190, 190): "top_right",
-            (190, 0): "bottom_right"
-        }
-        return corners.get((self.position.x, self.position.y))
-
-    def _get_edge_type(self) -> str:
-        """Determine if obstacle is at an edge and return edge type."""
-        if self.position.y == 0:
-            return "bottom"
-        elif self.position.y == 190:
-            return "top"
-        elif self.position.x == 0:
-            return "left"
-        elif self.position.x == 190:
-            return "right"
-        return None
-
-    def _get_corner_target_position(self, corner_type: str) -> RobotPosition:
-        """Get target position for corner obstacles."""
-        offset = constants.OBSTACLE_SAFETY_OFFSET + constants.OBSTACLE_LENGTH
-
-        corner_adjustments = {
-            "bottom_left": {"TOP": (10, 0), "RIGHT": (0, 10)},
-            "top_left": {"BOTTOM": (10, 0), "RIGHT": (0, -10)},
-            "top_right": {"BOTTOM": (-10, 0), "LEFT": (0, -10)},
-            "bottom_right": {"TOP": (-10, 0), "LEFT": (0, 10)}
-        }
-
-        direction = self.position.direction.name
-        base_target = self._get_standard_target_position()
-
-        if corner_type in corner_adjustments and direction in corner_adjustments[corner_type]:
-            x_adj, y_adj = corner_adjustments[corner_type][direction]
-            return RobotPosition(
-                base_target.x + x_adj,
-                base_target.y + y_adj,
-                base_target.direction
-            )
-
-        return base_target
+        x, y, direction = self._robot_target(
+            self.position.x, self.position.y, self.position.direction, self._corner_type, self._edge_type
+        )
+        return RobotPosition(x, y, direction)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _robot_target(x: int, y: int, direction: Direction, corner_type: Optional[str],
+                      edge_type: Optional[str]) -> Tuple[int, int, Direction]:
+        """
+        Compute the robot target for an obstacle at (x, y) facing direction.
 
-    def _get_edge_target_position(self, edge_type: str) -> RobotPosition:
-        """Get target position for edge obstacles."""
-        offset = constants.OBSTACLE_SAFETY_OFFSET + constants.OBSTACLE_LENGTH
+        Cached because the result depends only on the obstacle layout, and the same
+        obstacles are rebuilt for every path request.
 
-        edge_adjustments = {
-            "bottom": {"LEFT": (0, 10), "RIGHT": (0, 10)},
-            "top": {"LEFT": (0, -10), "RIGHT": (0, -10)},
-            "left": {"TOP": (10, 0), "BOTTOM": (10, 0)},
-            "right": {"TOP": (-10, 0), "BOTTOM": (-10, 0)}
-        }
-
-        direction = self.position.direction.name
-        base_target = self._get_standard_target_position()
+        Returns:
+            (x, y, direction) of the robot target
+        """
+        target_x, target_y, robot_direction = Obstacle._get_standard_target(x, y, direction)
 
-        if edge_type in edge_adjustments and direction in edge_adjustments[edge_type]:
-            x_adj, y_adj = edge_adjustments[edge_type][direction]
-            return RobotPosition(
-                base_target.x + x_adj,
-                base_target.y + y_adj,
-                base_target.direction
-            )
+        if corner_type is not None:
+            adjustments = _CORNER_ADJUSTMENTS[corner_type]
+        else:
+            adjustments = _EDGE_ADJUSTMENTS.get(edge_type, {})
 
-        return base_target
+        x_adj, y_adj = adjustments.get(direction, (0, 0))
+        return target_x + x_adj, target_y + y_adj, robot_direction
 
-    def _get_standard_target_position(self) -> RobotPosition:
+    @staticmethod
+    def _get_standard_target(x: int, y: int, direction: Direction) -> Tuple[int, int, Direction]:
         """Get standard target position based on obstacle direction."""
         offset = constants.OBSTACLE_SAFETY_OFFSET + constants.OBSTACLE_LENGTH
-
-        direction_targets = {
-            Direction.TOP: (self.position.x, self.position.y + offset, Direction.BOTTOM),
-            Direction.BOTTOM: (self.position.x, self.position.y - offset, Direction.TOP),
-            Direction.LEFT: (self.position.x - offset, self.position.y, Direction.RIGHT),
-            Direction.RIGHT: (self.position.x + offset, self.position.y, Direction.LEFT)
-        }
-
-        x, y, robot_direction = direction_targets[self.position.direction]
-        return RobotPosition(x, y, robot_direction)
+        (unit_x, unit_y), robot_direction = _DIRECTION_TARGETS[direction]
+        return x + unit_x * offset, y + unit_y * offset, robot_direction
 
     def draw_obstacles(self, screen: pygame.Surface) -> None:
         """Draw the obstacle and its direction indicator."""
@@ -234,20 +229,21 @@ class Obstacle:
 
         pygame.draw.rect(screen, constants.DARK_BLUE, indicator_rect)
 
-    def draw_virtual_boundary(self, screen: pygame.Surface) -> None:
-        """Draw the safety boundary around the obstacle."""
-        points = self.get_boundary_points()
+    @staticmethod
+    def _project_boundary_lines(points: List[Position]) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+        """Convert boundary corner points into pygame line endpoints."""
         pygame_points = [point.xy_pygame() for point in points]
 
-        # Draw boundary lines
-        boundary_lines = [
+        return [
             (pygame_points[0], pygame_points[2]),  # Left border
             (pygame_points[1], pygame_points[3]),  # Right border
             (pygame_points[2], pygame_points[3]),  # Top border
             (pygame_points[0], pygame_points[1])  # Bottom border
         ]
 
-        for start, end in boundary_lines:
+    def draw_virtual_boundary(self, screen: pygame.Surface) -> None:
+        """Draw the safety boundary around the obstacle."""
+        for start, end in self._boundary_lines_pygame:
             pygame.draw.line(screen, constants.RED, start, end)
 
     def draw_robot_target(self, screen: pygame.Surface) -> None:
@@ -1,8 +1,16 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import uvicorn
 from routes import predict
 
-app = FastAPI(title="MDP Obstacle Recognition")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and warm up the models before serving, off the event loop
+    await asyncio.to_thread(predict.warm_up_models)
+    yield
+
+app = FastAPI(title="MDP Obstacle Recognition", lifespan=lifespan)
 
 # Include route modules
 app.include_router(predict.router, tags=["Predict"])
@@ -1,8 +1,33 @@
-from enum import Enum
+from enum import IntEnum
 
 
-class Direction(Enum):
-    LEFT = 180
+class Direction(IntEnum):
+    """
+    Facing direction of the robot or an obstacle face.
+
+    Values are contiguous so that per-direction lookup tables can be plain
+    tuples indexed by the direction itself. Use `degrees` for the heading angle.
+    """
     RIGHT = 0
-    TOP = 90
-    BOTTOM = -90
\ No newline at end of file
+    TOP = 1
+    LEFT = 2
+    BOTTOM = 3
+
+    def __str__(self) -> str:
+        # Keep log output as "Direction.TOP" rather than the bare integer
+        return f"{type(self).__name__}.{self.name}"
+
+    @property
+    def degrees(self) -> int:
+        """Heading angle in degrees (RIGHT = 0, counter-clockwise positive)."""
+        return _DEGREES[self]
+
+    @classmethod
+    def from_degrees(cls, degrees: int) -> 'Direction':
+        """Look up the Direction for a heading angle in degrees."""
+        return _FROM_DEGREES[degrees]
+
+
+# Indexed by Direction value
+_DEGREES = (0, 90, 180, -90)
+_FROM_DEGREES = {degrees: Direction(code) for code, degrees in enumerate(_DEGREES)}
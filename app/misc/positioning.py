@@ -5,6 +5,8 @@ from typing import Optional, Tuple
 
 
 class Position:
+    __slots__ = ('x', 'y', 'direction')
+
     def __init__(self, x: float, y: float, direction: Optional[Direction] = None):
         """
         x and y coordinates are in terms of the coordinates
@@ -21,6 +23,15 @@ class Position:
 
     __repr__ = __str__
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y and self.direction == other.direction
+
+    # Positions are mutated in place (e.g. temp.x += ...), so they are deliberately unhashable;
+    # key dicts and sets on a frozen value such as xy_dir() or pack_node() instead
+    __hash__ = None
+
     def xy(self) -> Tuple[float, float]:
         """
         Return the x, y coordinates of the current Position.
@@ -50,6 +61,8 @@ class Position:
 
 
 class RobotPosition(Position):
+    __slots__ = ('angle',)
+
     def __init__(self, x: float, y: float, direction: Optional[Direction] = None, angle: Optional[float] = None):
         super().__init__(x, y, direction)
 
@@ -57,7 +70,7 @@ class RobotPosition(Position):
         if angle is not None:
             self.angle = angle
         elif direction is not None:
-            self.angle = direction.value
+            self.angle = direction.degrees
         else:
             self.angle = None
 
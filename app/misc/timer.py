@@ -2,6 +2,19 @@ import pygame
 import pygame.freetype
 import constants
 
+# Loaded on first use because pygame.freetype must be initialised before creating fonts
+_TIMER_FONT = None
+_TIMER_COLOR = pygame.Color("dodgerblue")
+
+
+def _get_timer_font():
+    """Return the shared font used for the timer."""
+    global _TIMER_FONT
+    if _TIMER_FONT is None:
+        _TIMER_FONT = pygame.freetype.SysFont(None, 34)
+        _TIMER_FONT.origin = True
+    return _TIMER_FONT
+
 
 class Timer:
     def __init__(self):
@@ -9,6 +22,9 @@ class Timer:
         self.end_time = 0
         self.is_running = False
         self.is_finished = False
+        # Last formatted time, reused while the elapsed time is unchanged (e.g. once stopped)
+        self._last_ms = -1
+        self._last_text = ""
 
     def start(self):
         """Start the timer."""
@@ -34,21 +50,22 @@ class Timer:
     def format_time(self):
         """Format elapsed time as MM:SS:mmm string."""
         elapsed_ms = self.get_elapsed_time()
+        if elapsed_ms == self._last_ms:
+            return self._last_text
 
         milliseconds = elapsed_ms % 1000
         total_seconds = elapsed_ms // 1000
         seconds = total_seconds % 60
         minutes = total_seconds // 60
 
-        return f"{minutes:02d}:{seconds:02d}:{milliseconds:03d}"
+        self._last_ms = elapsed_ms
+        self._last_text = f"{minutes:02d}:{seconds:02d}:{milliseconds:03d}"
+        return self._last_text
 
     def render(self, screen, position=None):
         """Render the timer on the screen."""
         if position is None:
             position = (constants.GRID_LENGTH + 40, constants.GRID_LENGTH // 2)
 
-        font = pygame.freetype.SysFont(None, 34)
-        font.origin = True
-
         time_text = self.format_time()
-        font.render_to(screen, position, time_text, pygame.Color("dodgerblue"))
\ No newline at end of file
+        _get_timer_font().render_to(screen, position, time_text, _TIMER_COLOR)
\ No newline at end of file
@@ -1,19 +1,39 @@
-import random
-from collections import deque
+import copy
+import threading
+from collections import OrderedDict, deque
+from itertools import groupby
 from typing import Tuple, List, Optional
 from dataclasses import dataclass
-import itertools
+
+import numpy as np
 
 import constants
+from commands.command import Command
 from commands.go_straight_command import StraightCommand
 from commands.scan_obstacle_command import ScanCommand
 from grid.grid import Grid
 from grid.obstacle import Obstacle
-from misc.direction import Direction
-from misc.positioning import Position
+from misc.positioning import Position, RobotPosition
 from path_finding.modified_a_star import ModifiedAStar
+from path_finding.tsp_kernels import (
+    held_karp, nearest_neighbor_paths, path_distance, population_distances, population_fitness, two_opt
+)
 from path_finding.weighted_a_star import WeightedAStar
 
+# Outcome of each A* segment search, keyed by grid type, obstacle layout and the start and
+# target poses. Repeated requests for the same layout then skip the searches entirely. The
+# server runs for a whole session, so only the most recently used searches are kept.
+_SEGMENT_CACHE_SIZE = 4096
+_SEGMENT_CACHE: "OrderedDict[tuple, Tuple[Optional[RobotPosition], Tuple[Command, ...]]]" = OrderedDict()
+# Path requests plan in worker threads; the lock covers the cache bookkeeping only, not searches
+_SEGMENT_CACHE_LOCK = threading.Lock()
+
+
+def clear_cache() -> None:
+    """Drop all cached A* segment results."""
+    with _SEGMENT_CACHE_LOCK:
+        _SEGMENT_CACHE.clear()
+
 
 @dataclass
 class PathMetrics:
@@ -30,171 +50,117 @@ class Hamiltonian:
     DISTANCE_SCALE_FACTOR = 10
     DIRECTION_CHANGE_WEIGHT = 5
     DIRECTION_DEGREE_UNIT = 90
-    MAX_OBSTACLES_FOR_BRUTE_FORCE = 8
+    MAX_OBSTACLES_FOR_BRUTE_FORCE = 16  # Exact Held-Karp below this; its table grows as 2^N * N
     GENETIC_POPULATION_SIZE = 100
     GENETIC_GENERATIONS = 500
     GENETIC_MUTATION_RATE = 0.02
+    GENETIC_PATIENCE = 50  # Generations without improvement before the GA stops early
     NEAREST_NEIGHBOR_ATTEMPTS = 5
     MAX_PATH_ATTEMPTS = 3
 
-    def __init__(self, robot, grid: Grid):
+    def __init__(self, robot, grid: Grid, seed: Optional[int] = None):
         """
         Initialize Hamiltonian path planner.
 
         Args:
             robot: Robot object with position information
             grid: Grid containing obstacles to visit
+            seed: Seed for the genetic algorithm's random generator, for reproducible plans
         """
         self.robot = robot
         self.grid = grid
         self.simple_hamiltonian = tuple()
         self.commands = deque()
+        self._rng = np.random.default_rng(seed)
 
-        # Precompute distance matrix for efficiency
-        self._distance_matrix = {}
+        # Precompute distance matrix for efficiency. Node 0 is the robot's start position
+        # and node i + 1 is obstacle i, so _dmat[a, b] is the cost of travelling from a to b.
         self._obstacles_list = list(self.grid.obstacles)
+        self._dmat = np.zeros((len(self._obstacles_list) + 1,) * 2)
+        self._cache_targets()
 
         if self._obstacles_list:
             self._precompute_distances()
 
     def _safe_copy_position(self, position) -> Position:
         """Safely copy a position object."""
-        if hasattr(position, 'copy'):
-            return position.copy()
-        elif hasattr(position, '__dict__'):
-            # Create new instance with same attributes
-            new_pos = type(position).__new__(type(position))
-            for attr, value in position.__dict__.items():
-                setattr(new_pos, attr, value)
-            return new_pos
-        else:
-            # Fallback: assume it's immutable
-            return position
+        # Attribute access is tried directly, as positions nearly always provide copy()
+        try:
+            copy_position = position.copy
+        except AttributeError:
+            # Shallow copy works for __slots__ classes too, and returns immutables as they are
+            return copy.copy(position)
+        return copy_position()
 
-    def _get_position_coordinates(self, position) -> Tuple[float, float]:
-        """Extract x, y coordinates from position object."""
-        if hasattr(position, 'x') and hasattr(position, 'y'):
-            return position.x, position.y
-        else:
-            raise ValueError(f"Position object {position} missing x or y attributes")
+    def _cache_targets(self):
+        """
+        Resolve each obstacle's target position once and store the node coordinates as arrays.
 
-    def _get_position_direction(self, position) -> Optional[Direction]:
-        """Extract direction from position object if available."""
-        return getattr(position, 'direction', None)
+        _tx, _ty and _tdir are indexed by distance matrix node, so entry 0 is the robot's
+        start and entry i + 1 is obstacle i. _tdir holds the direction in degrees, or NaN
+        where there is none, and _tvalid marks the nodes that have a target at all.
+        """
+        self._target_positions = {
+            obstacle: self._get_obstacle_target_position(obstacle) for obstacle in self._obstacles_list
+        }
+        positions = [self.robot.pos] + list(self._target_positions.values())
+
+        self._tvalid = np.array([position is not None for position in positions])
+        self._tx = np.array([position.x if position is not None else 0 for position in positions], dtype=np.float64)
+        self._ty = np.array([position.y if position is not None else 0 for position in positions], dtype=np.float64)
+        self._tdir = np.array([
+            position.direction.degrees
+            if position is not None and position.direction is not None else np.nan
+            for position in positions
+        ], dtype=np.float64)
 
     def _precompute_distances(self):
         """Precompute distances between all obstacle pairs and from start position"""
         if not self._obstacles_list:
             return
 
-        start_pos = self.robot.pos
-
-        # Distance from start to each obstacle
-        for i, obstacle in enumerate(self._obstacles_list):
-            try:
-                target_pos = self._get_obstacle_target_position(obstacle)
-                if target_pos:
-                    key = ('start', i)
-                    self._distance_matrix[key] = self._calculate_weighted_distance(
-                        start_pos, target_pos, is_first=True
-                    )
-            except Exception as e:
-                print(f"Warning: Could not compute distance to obstacle {i}: {e}")
-                # Set a default high distance
-                self._distance_matrix[('start', i)] = float('inf')
-
-        # Distance between each pair of obstacles
-        for i, obs1 in enumerate(self._obstacles_list):
-            for j, obs2 in enumerate(self._obstacles_list):
-                if i != j:
-                    try:
-                        target1 = self._get_obstacle_target_position(obs1)
-                        target2 = self._get_obstacle_target_position(obs2)
-
-                        if target1 and target2:
-                            key = (i, j)
-                            self._distance_matrix[key] = self._calculate_weighted_distance(
-                                target1, target2, is_first=False
-                            )
-                    except Exception as e:
-                        print(f"Warning: Could not compute distance between obstacles {i}-{j}: {e}")
-                        # Set a default high distance
-                        self._distance_matrix[(i, j)] = float('inf')
+        valid = self._tvalid
+        for i in np.flatnonzero(~valid):
+            print(f"Warning: Could not compute distances to obstacle {i - 1}")
 
-    def _get_obstacle_target_position(self, obstacle: Obstacle):
-        """Get target position from obstacle, handling different method names."""
-        # Try different method names for compatibility
-        methods_to_try = ['target_position', 'get_robot_target_pos']
-
-        for method_name in methods_to_try:
-            if hasattr(obstacle, method_name):
-                attr_or_method = getattr(obstacle, method_name)
-                if callable(attr_or_method):
-                    return attr_or_method()
-                else:
-                    return attr_or_method
-
-        print(f"Warning: Could not find target position for obstacle {obstacle}")
-        return None
-
-    def _calculate_weighted_distance(self, source_pos, dest_pos, is_first: bool = False) -> float:
-        """Calculate weighted distance between two positions with error handling."""
-        try:
-            # Get coordinates
-            sx, sy = self._get_position_coordinates(source_pos)
-            dx, dy = self._get_position_coordinates(dest_pos)
+        xs, ys, degrees = self._tx, self._ty, self._tdir
 
-            # Calculate grid distance using Chebyshev distance (diagonal movement allowed)
-            abs_x_diff = abs(sx - dx)
-            abs_y_diff = abs(sy - dy)
+        # Grid distance allowing diagonal movement, for every (source, destination) pair at once.
+        # A diagonal run of min(|dx|, |dy|) plus the straight remainder is just max(|dx|, |dy|).
+        abs_x_diff = np.abs(xs[:, None] - xs[None, :])
+        abs_y_diff = np.abs(ys[:, None] - ys[None, :])
+        grid_distance = np.maximum(abs_x_diff, abs_y_diff) / self.DISTANCE_SCALE_FACTOR
 
-            diag_distance = min(abs_x_diff, abs_y_diff)
-            remaining_x = abs_x_diff - diag_distance
-            remaining_y = abs_y_diff - diag_distance
+        # Direction change penalty, taking the shorter way round (e.g. 270 degrees is 90)
+        direction_diff = np.abs(degrees[:, None] - degrees[None, :])
+        direction_diff = np.where(direction_diff > 180, 360 - direction_diff, direction_diff)
+        direction_penalty = np.nan_to_num(
+            direction_diff / self.DIRECTION_DEGREE_UNIT * self.DIRECTION_CHANGE_WEIGHT, nan=0.0
+        )
 
-            grid_distance = (diag_distance + remaining_x + remaining_y) / self.DISTANCE_SCALE_FACTOR
+        # Pairs involving a missing target stay infinite so paths through them are rejected
+        size = len(valid)
+        self._dmat = np.full((size, size), np.inf, dtype=np.float64)
+        reachable = np.ix_(valid, valid)
+        self._dmat[reachable] = (grid_distance + direction_penalty)[reachable]
 
-            # Calculate direction change penalty
-            direction_penalty = 0
-            source_dir = self._get_position_direction(source_pos)
-            dest_dir = self._get_position_direction(dest_pos)
-
-            if source_dir and dest_dir:
-                direction_diff = abs(source_dir.value - dest_dir.value)
-                # Handle wrap-around (e.g., 350° to 10° should be 20°, not 340°)
-                if direction_diff > 180:
-                    direction_diff = 360 - direction_diff
-                direction_penalty = (direction_diff / self.DIRECTION_DEGREE_UNIT) * self.DIRECTION_CHANGE_WEIGHT
-
-            return grid_distance + direction_penalty
+    def _get_obstacle_target_position(self, obstacle: Obstacle):
+        """Get target position from obstacle, handling different method names."""
+        # Try the current attribute first and the older method name for compatibility
+        try:
+            target = obstacle.target_position
+        except AttributeError:
+            try:
+                target = obstacle.get_robot_target_pos
+            except AttributeError:
+                print(f"Warning: Could not find target position for obstacle {obstacle}")
+                return None
 
-        except Exception as e:
-            print(f"Error calculating distance between {source_pos} and {dest_pos}: {e}")
-            return float('inf')
+        return target() if callable(target) else target
 
     def _get_path_distance(self, path: List[int]) -> float:
         """Calculate total distance for a given path using precomputed distances"""
-        if not path:
-            return 0.0
-
-        total_distance = 0
-
-        # Distance from start to first obstacle
-        start_key = ('start', path[0])
-        if start_key in self._distance_matrix:
-            total_distance += self._distance_matrix[start_key]
-        else:
-            return float('inf')  # Invalid path
-
-        # Distance between consecutive obstacles
-        for i in range(len(path) - 1):
-            key = (path[i], path[i + 1])
-            if key in self._distance_matrix:
-                total_distance += self._distance_matrix[key]
-            else:
-                return float('inf')  # Invalid path
-
-        return total_distance
+        return path_distance(self._dmat, path)
 
     def _nearest_neighbor_heuristic(self) -> List[int]:
         """Fast nearest neighbor heuristic for TSP"""
@@ -202,50 +168,19 @@ class Hamiltonian:
             return []
 
         obstacles_indices = list(range(len(self._obstacles_list)))
-        best_path = None
-        best_distance = float('inf')
 
-        # Try multiple starting points for better results
+        # Try multiple starting points for better results. The attempts are independent,
+        # so they are all advanced together in one batch.
         attempts = min(self.NEAREST_NEIGHBOR_ATTEMPTS, len(obstacles_indices))
+        paths, complete = nearest_neighbor_paths(self._dmat, np.arange(attempts))
 
-        for start_idx in range(attempts):
-            if start_idx >= len(obstacles_indices):
-                break
-
-            path = []
-            unvisited = set(obstacles_indices)
-            current = obstacles_indices[start_idx]
-            unvisited.remove(current)
-            path.append(current)
-
-            while unvisited:
-                # Find nearest unvisited obstacle
-                min_distance = float('inf')
-                nearest = None
-
-                for candidate in unvisited:
-                    key = (current, candidate)
-                    if key in self._distance_matrix:
-                        distance = self._distance_matrix[key]
-                        if distance < min_distance:
-                            min_distance = distance
-                            nearest = candidate
-
-                if nearest is None:
-                    break  # No valid connections
-
-                path.append(nearest)
-                unvisited.remove(nearest)
-                current = nearest
-
-            # Only consider complete paths
-            if len(path) == len(obstacles_indices):
-                distance = self._get_path_distance(path)
-                if distance < best_distance:
-                    best_distance = distance
-                    best_path = path
-
-        return best_path if best_path else obstacles_indices
+        # Only consider complete paths
+        distances = np.where(complete, population_distances(self._dmat, paths), np.inf)
+        best = int(np.argmin(distances))
+        if not np.isfinite(distances[best]):
+            return obstacles_indices
+
+        return paths[best].tolist()
 
     def _genetic_algorithm_tsp(self) -> List[int]:
         """Genetic algorithm for larger TSP instances"""
@@ -254,118 +189,109 @@ class Hamiltonian:
         if len(obstacles_indices) <= 2:
             return obstacles_indices
 
-        def create_individual():
-            individual = obstacles_indices.copy()
-            random.shuffle(individual)
-            return individual
+        size = len(obstacles_indices)
+        rng = self._rng
 
-        def fitness(individual):
-            distance = self._get_path_distance(individual)
-            return 1.0 / (1.0 + distance) if distance != float('inf') else 0.0
+        def create_individuals(count):
+            return rng.permuted(np.tile(np.arange(size, dtype=np.int16), (count, 1)), axis=1)
 
-        def crossover(parent1, parent2):
-            """Order crossover (OX)"""
-            size = len(parent1)
-            if size < 2:
-                return parent1.copy()
+        def distinct_pairs(count):
+            """Draw count ascending pairs of distinct positions in the path"""
+            first = rng.integers(0, size, count)
+            second = rng.integers(0, size - 1, count)
+            second += second >= first
+            return np.sort(np.stack((first, second), axis=1), axis=1).tolist()
 
-            start, end = sorted(random.sample(range(size), 2))
+        def crossover(parent1, parent2, start, end):
+            """Order crossover (OX)"""
             child = [-1] * size
             child[start:end] = parent1[start:end]
 
+            # Membership mask over obstacle indices, so each check is O(1) rather than a scan of child
+            used = [False] * size
+            for item in child[start:end]:
+                used[item] = True
+
             pointer = end % size
             for item in parent2[end:] + parent2[:end]:
-                if item not in child:
+                if not used[item]:
                     while child[pointer] != -1:
                         pointer = (pointer + 1) % size
                     child[pointer] = item
 
             return child
 
-        def mutate(individual):
-            if random.random() < self.GENETIC_MUTATION_RATE and len(individual) >= 2:
-                i, j = random.sample(range(len(individual)), 2)
-                individual[i], individual[j] = individual[j], individual[i]
-
-        # Initialize population
-        population = [create_individual() for _ in range(self.GENETIC_POPULATION_SIZE)]
+        # Initialize population, one individual per row so fitness is evaluated for all rows at once.
+        # int16 comfortably holds any obstacle index and keeps the whole population compact.
+        population = create_individuals(self.GENETIC_POPULATION_SIZE)
 
         # Add nearest neighbor solution to population if available
         nn_solution = self._nearest_neighbor_heuristic()
         if nn_solution and len(population) > 0:
             population[0] = nn_solution
 
-        for generation in range(self.GENETIC_GENERATIONS):
-            # Evaluate fitness
-            fitness_scores = []
-            for individual in population:
-                score = fitness(individual)
-                fitness_scores.append((individual, score))
+        best_score = -1.0
+        stagnation = 0
 
-            fitness_scores.sort(key=lambda x: x[1], reverse=True)
+        for generation in range(self.GENETIC_GENERATIONS):
+            # Evaluate fitness, best first (stable, so ties keep population order)
+            scores = population_fitness(self._dmat, population)
+            ranking = np.argsort(-scores, kind='stable')
+
+            # Stop once the best path has not improved for a while
+            if scores[ranking[0]] > best_score:
+                best_score = scores[ranking[0]]
+                stagnation = 0
+            else:
+                stagnation += 1
+                if stagnation >= self.GENETIC_PATIENCE:
+                    break
 
             # Selection (top 50%)
-            survivors = [individual for individual, _ in fitness_scores[:len(population) // 2]]
+            survivors = population[ranking[:len(population) // 2]]
 
-            if not survivors:  # Fallback if no valid solutions
+            if len(survivors) == 0:  # Fallback if no valid solutions
                 return obstacles_indices
 
-            # Generate new population
-            new_population = survivors.copy()
-            while len(new_population) < self.GENETIC_POPULATION_SIZE:
-                parent1, parent2 = random.choices(survivors, k=2)
-                child = crossover(parent1, parent2)
-                mutate(child)
-                new_population.append(child)
+            new_population = np.empty_like(population)
+            new_population[:len(survivors)] = survivors
+            offspring = self.GENETIC_POPULATION_SIZE - len(survivors)
+
+            # Halfway to giving up, refill the bottom half with fresh random individuals
+            # instead of offspring, to shake the population out of a local optimum
+            if stagnation == self.GENETIC_PATIENCE // 2:
+                new_population[len(survivors):] = create_individuals(offspring)
+                population = new_population
+                continue
+
+            # Generate new population. The random choices for the whole generation are
+            # drawn up front, and crossover works on plain lists, which are cheaper to
+            # index element by element than array rows.
+            parents = survivors.tolist()
+            parent_pairs = rng.integers(0, len(parents), (offspring, 2)).tolist()
+            cuts = distinct_pairs(offspring)
+            mutations = (rng.random(offspring) < self.GENETIC_MUTATION_RATE).tolist()
+            swaps = distinct_pairs(offspring)
+
+            for k in range(offspring):
+                first, second = parent_pairs[k]
+                child = crossover(parents[first], parents[second], *cuts[k])
+                if mutations[k]:
+                    i, j = swaps[k]
+                    child[i], child[j] = child[j], child[i]
+                new_population[len(survivors) + k] = child
 
             population = new_population
 
         # Return best solution
-        if population:
-            best_individual = max(population, key=fitness)
-            return best_individual
+        if len(population) > 0:
+            return population[np.argmax(population_fitness(self._dmat, population))].tolist()
         else:
             return obstacles_indices
 
     def _optimize_with_2opt(self, path: List[int]) -> List[int]:
         """Apply 2-opt local optimization"""
-        if len(path) < 3:
-            return path.copy()
-
-        def reverse_segment(tour, i, j):
-            """Reverse segment between indices i and j"""
-            new_tour = tour.copy()
-            new_tour[i:j + 1] = list(reversed(new_tour[i:j + 1]))
-            return new_tour
-
-        best_path = path.copy()
-        best_distance = self._get_path_distance(best_path)
-
-        if best_distance == float('inf'):
-            return path.copy()
-
-        improved = True
-        max_iterations = 100  # Prevent infinite loops
-
-        iteration = 0
-        while improved and iteration < max_iterations:
-            improved = False
-            iteration += 1
-
-            for i in range(len(path)):
-                for j in range(i + 2, len(path)):
-                    new_path = reverse_segment(best_path, i, j)
-                    new_distance = self._get_path_distance(new_path)
-
-                    if new_distance < best_distance:
-                        best_path = new_path
-                        best_distance = new_distance
-                        improved = True
-                        break
-                if improved:
-                    break
-
-        return best_path
+        return two_opt(self._dmat, path).tolist()
 
     def compute_optimal_hamiltonian_path(self) -> Tuple[Obstacle, ...]:
         """
@@ -380,11 +306,9 @@ class Hamiltonian:
 
         try:
             if num_obstacles <= self.MAX_OBSTACLES_FOR_BRUTE_FORCE:
-                # Use brute force for small instances
-                print("Using brute force approach...")
-                obstacle_indices = list(range(num_obstacles))
-                perms = itertools.permutations(obstacle_indices)
-                best_path_indices = min(perms, key=self._get_path_distance)
+                # Solve small instances exactly
+                print("Using Held-Karp dynamic programming approach...")
+                best_path_indices = held_karp(self._dmat).tolist()
             else:
                 # Use genetic algorithm for larger instances
                 print("Using genetic algorithm approach...")
@@ -423,41 +347,55 @@ class Hamiltonian:
             print("No commands to compress.")
             return
 
+        # One pass over runs of straight / non-straight commands; each straight run of
+        # two or more becomes a single command covering the summed distance
         compressed = deque()
-        current_command = None
-
-        try:
-            current_command = self.commands.popleft()
-        except IndexError:
-            print("No commands to compress.")
-            return
-
-        while self.commands:
-            try:
-                next_command = self.commands.popleft()
-
-                if (isinstance(current_command, StraightCommand) and
-                        isinstance(next_command, StraightCommand)):
-                    # Merge straight commands
-                    current_command = StraightCommand(
-                        current_command.dist + next_command.dist
-                    )
-                else:
-                    compressed.append(current_command)
-                    current_command = next_command
-            except Exception as e:
-                print(f"Error compressing commands: {e}")
-                break
-
-        # Add the last command
-        if current_command:
-            compressed.append(current_command)
+        for is_straight, run in groupby(self.commands, key=lambda command: isinstance(command, StraightCommand)):
+            run = list(run)
+            if is_straight and len(run) > 1:
+                compressed.append(StraightCommand(sum(command.dist for command in run)))
+            else:
+                compressed.extend(run)
 
         self.commands = compressed
         print("Done!")
 
     def _find_path_with_fallback(self, curr_pos, target_pos, obstacle) -> Optional[Position]:
-        """Find path with multiple fallback strategies"""
+        """Find path with multiple fallback strategies, reusing earlier searches on the same layout"""
+        key = (
+            type(self.grid), self.grid.layout_key,
+            curr_pos.xy() + (curr_pos.direction,), target_pos.xy() + (target_pos.direction,)
+        )
+        with _SEGMENT_CACHE_LOCK:
+            cached = _SEGMENT_CACHE.get(key)
+            if cached is not None:
+                _SEGMENT_CACHE.move_to_end(key)
+
+        if cached is None:
+            cached = self._search_segment(curr_pos, target_pos)
+            with _SEGMENT_CACHE_LOCK:
+                _SEGMENT_CACHE[key] = cached
+                if len(_SEGMENT_CACHE) > _SEGMENT_CACHE_SIZE:
+                    _SEGMENT_CACHE.popitem(last=False)
+        else:
+            print("  Reusing previously planned path...")
+
+        result, commands = cached
+        if result is None:
+            print(f"  No path found to {obstacle} after all attempts!")
+            return None
+
+        # Commands track their own tick progress, so each plan gets fresh copies
+        self.commands.extend(copy.copy(command) for command in commands)
+        return result.copy()
+
+    def _search_segment(self, curr_pos, target_pos) -> Tuple[Optional[RobotPosition], Tuple[Command, ...]]:
+        """
+        Run the A* variants in turn until one reaches the target.
+
+        Returns:
+            (final position, commands) of the first successful search, or (None, ()) if all fail
+        """
         algorithms = [
             (constants.WEIGHTED_A_STAR, "Weighted A*"),
             (constants.MODIFIED_A_STAR, "Modified A*")
@@ -471,22 +409,21 @@ class Hamiltonian:
                     if mode == constants.MODIFIED_A_STAR:
                         result, commands = ModifiedAStar(
                             self.grid, self, curr_pos, target_pos, rerun
-                        ).start_astar(True)
+                        ).start_astar(False)
                     else:
                         result, commands = WeightedAStar(
                             self.grid, self, curr_pos, target_pos, rerun
-                        ).start_astar(True)
+                        ).start_astar(False)
 
                     if result is not None:
                         print(f"  Path found with {name}!")
-                        return result
+                        return result.copy(), tuple(copy.copy(command) for command in commands)
 
                 except Exception as e:
                     print(f"  Error with {name}: {e}")
                     continue
 
-        print(f"  No path found to {obstacle} after all attempts!")
-        return None
+        return None, ()
 
     def plan_path(self):
         """Plan the complete path with optimized algorithms"""
@@ -510,7 +447,7 @@ class Hamiltonian:
 
             for i, obstacle in enumerate(self.simple_hamiltonian):
                 try:
-                    target_pos = self._get_obstacle_target_position(obstacle)
+                    target_pos = self._target_positions.get(obstacle)
                     if target_pos is None:
                         print(f"  WARNING: Could not get target position for obstacle {obstacle}")
                         continue
@@ -1,7 +1,10 @@
+import copy
 import heapq
 import math
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
+import constants
 from commands.command import Command
 from commands.go_straight_command import StraightCommand
 from commands.turn_command import TurnCommand
@@ -11,16 +14,111 @@ from misc.positioning import RobotPosition
 from misc.type_of_turn import TypeOfTurn
 
 
+def pack_node(x: int, y: int, direction: Direction) -> int:
+    """
+    Pack an A* search state into a single int, which hashes and compares faster than a tuple.
+
+    Coordinates only need to stay within +-2**15, far beyond the arena.
+    """
+    return (x * 65536 + y) * 4 + direction
+
+
+# Step direction along (x, y) for each quadrant of a turn's displacement, keyed by the signs
+# of (diff_in_x, diff_in_y). Displacements on an axis sweep as the bottom right quadrant.
+_QUADRANT_STEPS = {
+    (1, 1): (1, 1),  # top right
+    (-1, 1): (-1, 1),  # top left
+    (-1, -1): (-1, -1),  # bottom left
+}
+_DEFAULT_STEPS = (1, -1)  # bottom right
+
+# Moves tried from every node. Searches only read these through apply_on_pos and
+# attributes, and extract_commands hands out copies, as commands carry tick state.
+_STRAIGHT_DIST = 10
+_STRAIGHT_COMMANDS = (
+    StraightCommand(_STRAIGHT_DIST),
+    StraightCommand(-_STRAIGHT_DIST),
+)
+_TURN_COMMANDS = (
+    TurnCommand(TypeOfTurn.MEDIUM, True, False, False),  # L MEDIUM turn, forward
+    TurnCommand(TypeOfTurn.MEDIUM, True, False, True),  # L MEDIUM turn, reverse
+    TurnCommand(TypeOfTurn.MEDIUM, False, True, False),  # R MEDIUM turn, forward
+    TurnCommand(TypeOfTurn.MEDIUM, False, True, True),  # R MEDIUM turn, reverse
+)
+
+# Unit step along (x, y) of a forward straight move, indexed by Direction
+_STRAIGHT_STEPS = (
+    (1, 0),  # Direction.RIGHT
+    (0, 1),  # Direction.TOP
+    (-1, 0),  # Direction.LEFT
+    (0, -1),  # Direction.BOTTOM
+)
+
+
+def _sign(value: int) -> int:
+    return (value > 0) - (value < 0)
+
+
+@lru_cache(maxsize=None)
+def _turn_sweep_offsets(diff_in_x: int, diff_in_y: int, direction: Direction) -> Tuple[Tuple[int, int], ...]:
+    """
+    Offsets from a turn's start position of every cell the turn must keep clear.
+
+    The robot is taken to sweep an L-shape between its start and end positions, one
+    10 cm step at a time. A robot starting along the y axis (facing top or bottom) sweeps
+    along y first and then x; one starting along the x axis sweeps x first and then y.
+    Turns ending below and to the left always sweep x first, whatever the starting
+    direction, as the original per-quadrant checks did. A turn's displacement depends
+    only on its type and the starting direction, so each sweep is worked out once.
+
+    Args:
+        diff_in_x: End x minus start x (positive means the turn ends to the right)
+        diff_in_y: End y minus start y (positive means the turn ends above)
+        direction: Direction faced at the start of the turn
+
+    Returns:
+        (dx, dy) offsets, starting with the end position itself
+    """
+    steps_y = abs(diff_in_y // 10)
+    steps_x = abs(diff_in_x // 10)
+    quadrant = (_sign(diff_in_x), _sign(diff_in_y))
+    sign_x, sign_y = _QUADRANT_STEPS.get(quadrant, _DEFAULT_STEPS)
+    # The original bottom left check read `p.direction == Direction.LEFT or p.direction.RIGHT`,
+    # which was always true, so planned routes depend on that quadrant sweeping x first
+    y_first = (direction == Direction.TOP or direction == Direction.BOTTOM) and quadrant != (-1, -1)
+
+    offsets = [(diff_in_x, diff_in_y)]
+    if y_first:
+        # Up or down from the start, then across into the end position
+        offsets += [(0, sign_y * step * 10) for step in range(1, steps_y + 1)]
+        offsets += [(diff_in_x - sign_x * step * 10, diff_in_y) for step in range(1, steps_x + 1)]
+    else:
+        # Across from the start, then up or down into the end position
+        offsets += [(diff_in_x, diff_in_y - sign_y * step * 10) for step in range(1, steps_y + 1)]
+        offsets += [(sign_x * step * 10, 0) for step in range(1, steps_x + 1)]
+    return tuple(offsets)
+
+
 class ModifiedAStar:
     def __init__(self, grid, brain, start: RobotPosition, end: RobotPosition, yolo):
-        # We use a copy of the grid rather than use a reference to the exact grid.
-        self.grid: Grid = grid.copy()
+        # The search only reads the grid, so every searcher on a layout shares the same one
+        self.grid: Grid = grid
         self.brain = brain  # the Hamiltonian object
         self.start = start  # starting robot position (with direction)
         self.end = end  # target ending position (with direction)
         self.yolo = yolo
-
-    def get_neighbours(self, pos: RobotPosition) -> List[Tuple[Tuple, RobotPosition, int, Command]]:
+        # Valid positions as nested lists indexed [row][col], so a query is two list lookups
+        # rather than a walk over nearby obstacles
+        self._valid_cells = self.grid.valid_cells().tolist()
+        self._valid_cells_yolo = self.grid.valid_cells(bool(yolo)).tolist()
+        # Scratch position for queries off the cell grid, which fall back to the grid itself
+        self._probe = RobotPosition(0, 0)
+        # (distance, direction) heuristic terms per node, as nodes are reached repeatedly
+        self._h_cache: Dict[int, Tuple[float, float]] = {}
+        # Neighbours per node, since stale frontier entries expand a node again
+        self._neighbour_cache: Dict[int, List[Tuple[int, RobotPosition, int, Command]]] = {}
+
+    def get_neighbours(self, pos: RobotPosition) -> List[Tuple[int, RobotPosition, int, Command]]:
         """
         Get movement neighbours from this position.
         Note that all values in the Position object (x, y, direction) are all with respect to the grid!
@@ -29,205 +127,133 @@ class ModifiedAStar:
         # We assume the robot will move by 10 when travelling straight, while moving a fixed x and y value when turning
         neighbours = []
 
-        # Check travel straights.
-        straight_dist = 10
-        straight_commands = [
-            StraightCommand(straight_dist),
-            StraightCommand(-straight_dist),
-        ]
-
-        for command in straight_commands:
-            # Check if doing this command does not bring us to any invalid position.
-            after, p = self.check_valid_command(command, pos)
-            if after:
-                neighbours.append((after, p, straight_dist, command))
+        # Check travel straights. Straights keep the direction and cover a single cell, so only the end cell
+        # needs checking, without the generic copy-apply-sweep of check_valid_command.
+        step_x, step_y = _STRAIGHT_STEPS[pos.direction]
+        for command in _STRAIGHT_COMMANDS:
+            end_x = pos.x + step_x * command.dist
+            end_y = pos.y + step_y * command.dist
+            if self._is_free(end_x, end_y):
+                p = RobotPosition(end_x, end_y, pos.direction, pos.angle)
+                neighbours.append((pack_node(end_x, end_y, pos.direction), p, _STRAIGHT_DIST, command))
 
         # Check turns - ONLY MEDIUM turns now
         turn_penalty = 50 if not self.yolo else 0
-        turn_commands = [
-            TurnCommand(TypeOfTurn.MEDIUM, True, False, False),  # L MEDIUM turn, forward
-            TurnCommand(TypeOfTurn.MEDIUM, True, False, True),  # L MEDIUM turn, reverse
-            TurnCommand(TypeOfTurn.MEDIUM, False, True, False),  # R MEDIUM turn, forward
-            TurnCommand(TypeOfTurn.MEDIUM, False, True, True),  # R MEDIUM turn, reverse
-        ]
-
-        for c in turn_commands:
+        for c in _TURN_COMMANDS:
             # Check if doing this command does not bring us to any invalid position.
             after, p = self.check_valid_command(c, pos)
-            if after:
+            if after is not None:
                 neighbours.append((after, p, turn_penalty, c))
 
         return neighbours
 
+    def cached_neighbours(self, node: int, pos: RobotPosition) -> List[Tuple[int, RobotPosition, int, Command]]:
+        """
+        Neighbours of a node, generated on its first expansion only.
+
+        get_neighbours depends only on the node's (x, y, direction), as the grid and yolo
+        level are fixed for the search.
+        """
+        neighbours = self._neighbour_cache.get(node)
+        if neighbours is None:
+            neighbours = self.get_neighbours(pos)
+            self._neighbour_cache[node] = neighbours
+        return neighbours
+
     def check_valid_command(self, command: Command, p: RobotPosition):
         """
         Checks if a command will bring a point into any invalid position.
 
         If invalid, we return None for both the resulting grid location and the resulting position.
         """
-        # Check specifically for validity of turn command. Robot should not exceed the grid or hit the obstacles
+        start_x, start_y, start_direction = p.x, p.y, p.direction
         p = p.copy()
+        command.apply_on_pos(p)
 
+        # Check specifically for validity of turn command. Robot should not exceed the grid or hit the obstacles.
+        # The end position and the cells swept on the way there must all be valid, and are
+        # checked from plain coordinates rather than position copies.
         if isinstance(command, TurnCommand):
-            p_c = p.copy()
-            command.apply_on_pos(p_c)
-
-            # make sure that the final position is a valid one
-            if not (self.grid.check_valid_position(p_c, self.yolo)):
-                return None, None
-
-            # if positive means the new position is to the right, else to the left side
-            diff_in_x = p_c.x - p.x
-            # if positive means the new position is on top of old position, else otherwise
-            diff_in_y = p_c.y - p.y
-
-            # additional check for medium turn
-            extraCheck = 0
-
-            # displace to top right
-            if diff_in_y > 0 and diff_in_x > 0:
-                if p.direction == Direction.TOP or p.direction == Direction.BOTTOM:
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.y += (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.x -= (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                else:  # rest of the directions
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.y -= (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.x += (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-            # displace to top left
-            elif diff_in_x < 0 and diff_in_y > 0:
-                if p.direction == Direction.TOP or p.direction == Direction.BOTTOM:
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.y += (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.x += (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                else:
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.y -= (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.x -= (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-            # displace to bottom left
-            elif diff_in_x < 0 and diff_in_y < 0:
-                if p.direction == Direction.LEFT or p.direction.RIGHT:
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.y += (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.x -= (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                else:
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.y -= (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.x += (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-            else:  # diff_in_x > 0 , diff_in_y < 0
-                if p.direction == Direction.RIGHT or p.direction == Direction.LEFT:
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.y += (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.x += (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                else:
-                    for y in range(0, abs(diff_in_y // 10) + extraCheck):
-                        temp = p.copy()
-                        temp.y -= (y + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-                    for x in range(0, abs(diff_in_x // 10) + extraCheck):
-                        temp = p_c.copy()
-                        temp.x -= (x + 1) * 10
-                        if not (self.grid.check_valid_position(temp, self.yolo)):
-                            return None, None
-
-        command.apply_on_pos(p)
+            for offset_x, offset_y in _turn_sweep_offsets(p.x - start_x, p.y - start_y, start_direction):
+                if not self._is_free(start_x + offset_x, start_y + offset_y, self.yolo):
+                    return None, None
 
-        if self.grid.check_valid_position(p) and (after := p.xy() + (p.get_dir(),)):
-            return after, p
+        if self._is_free(p.x, p.y):
+            return pack_node(p.x, p.y, p.direction), p
         return None, None
 
+    def _is_free(self, x: int, y: int, yolo=False) -> bool:
+        """Check a coordinate as grid.check_valid_position(position, yolo) would."""
+        col, col_offset = divmod(x, constants.GRID_CELL_LENGTH)
+        row, row_offset = divmod(y, constants.GRID_CELL_LENGTH)
+        if col_offset or row_offset:
+            self._probe.x = x
+            self._probe.y = y
+            return self.grid.check_valid_position(self._probe, yolo)
+
+        cells = self._valid_cells_yolo if yolo else self._valid_cells
+        return 0 <= row < len(cells) and 0 <= col < len(cells[row]) and cells[row][col]
+
     def distance_heuristic(self, curr_pos: RobotPosition):
         """
         Measure the difference in distance between the provided position and the
         end position.
         """
-        dx = abs(curr_pos.x - self.end.x)
-        dy = abs(curr_pos.y - self.end.y)
-        return math.sqrt(dx ** 2 + dy ** 2)
+        # hypot is one C call, and gives the same result as sqrt(dx ** 2 + dy ** 2) for grid coordinates
+        return math.hypot(curr_pos.x - self.end.x, curr_pos.y - self.end.y)
+
+    def heuristic_terms(self, node: int, pos: RobotPosition) -> Tuple[float, float]:
+        """
+        Distance and direction heuristics of a node, computed on its first visit only.
+
+        The terms are kept separate so callers add them in the same order as before.
+        """
+        terms = self._h_cache.get(node)
+        if terms is None:
+            terms = self.distance_heuristic(pos), self.direction_heuristic(pos)
+            self._h_cache[node] = terms
+        return terms
 
     def direction_heuristic(self, curr_pos: RobotPosition):
         """
         If not same direction as my target end position, incur penalty!
+
+        The original check compared a Direction against its raw value and never matched, so
+        every node has always paid the penalty. Planned routes depend on that, so it is kept.
         """
-        if self.end.direction == curr_pos.direction.value:
-            return 0
-        else:
-            return 10
+        return 10
 
     def start_astar(self, flag):
         frontier = []  # Store frontier nodes to travel to as a priority queue.
         backtrack = dict()  # Store the sequence of grid cells being travelled.
         cost = dict()  # Store the cost to travel from start to a target grid cell.
+        expanded = dict()  # Cost of each node when its neighbours were last relaxed.
 
-        # We can check what the goal grid cell is
-        goal_node: Tuple = self.end.xy()
-        goal_node_with_dir: Tuple = goal_node + (self.end.direction,)
+        # We can check what the goal grid cell is. Nodes are (x, y, direction) packed into an int.
+        goal_node_with_dir = pack_node(self.end.x, self.end.y, self.end.direction)
 
         # Add starting node set into the frontier.
-        start_node: Tuple = self.start.xy()
-        start_node_with_dir: Tuple = start_node + (self.start.direction,)
+        start_node_with_dir = pack_node(self.start.x, self.start.y, self.start.direction)
 
         offset = 0  # Used to tie-break
 
         # Extra time parameter to tie-break same priority.
-        heapq.heappush(frontier, (0, offset, (start_node_with_dir, self.start)))
+        heapq.heappush(frontier, (0, offset, start_node_with_dir))
         cost[start_node_with_dir] = 0
         # Having None as the parent means this key is the starting node.
         backtrack[start_node_with_dir] = (None, None)  # Parent, Command
+        # Robot position of each node, so frontier entries only need to carry the node key
+        positions = {start_node_with_dir: self.start}
+
+        # Bound methods used in the loop are looked up once
+        push, pop = heapq.heappush, heapq.heappop
+        cost_get, expanded_get = cost.get, expanded.get
+        heuristic_terms, cached_neighbours = self.heuristic_terms, self.cached_neighbours
 
         while frontier:
             # Get the highest priority node.
-            priority, _, (current_node, current_position) = heapq.heappop(frontier)
+            priority, _, current_node = pop(frontier)
+            current_position = positions[current_node]
 
             # If the current node is our goal.
             if current_node == goal_node_with_dir:
@@ -235,28 +261,26 @@ class ModifiedAStar:
                 commands = self.extract_commands(backtrack, goal_node_with_dir, flag)
                 return current_position, commands
 
+            # Skip stale entries: if the node was already expanded at its current cost,
+            # expanding it again cannot improve any neighbour
+            current_cost = cost[current_node]
+            if expanded_get(current_node, math.inf) <= current_cost:
+                continue
+            expanded[current_node] = current_cost
+
             # Otherwise, we check through all possible locations that we can
             # travel to from this node.
-            neighbours = self.get_neighbours(current_position)
-
-            for new_node, new_pos, weight, c in neighbours:
-                # weight here stands for cost of moving forward or turning
-                revisit = 0
-
-                if new_node in backtrack:
-                    revisit = 10
-
-                new_cost = cost.get(current_node) + weight + revisit
+            for new_node, new_pos, weight, c in cached_neighbours(current_node, current_position):
+                # weight here stands for cost of moving forward or turning, plus a revisit penalty
+                new_cost = current_cost + weight + (10 if new_node in backtrack else 0)
 
-                if new_cost < cost.get(new_node, 100000):
+                if new_cost < cost_get(new_node, 100000):
                     offset += 1
-                    priority = (
-                            new_cost
-                            + self.distance_heuristic(new_pos)
-                            + self.direction_heuristic(new_pos)
-                    )
+                    distance_h, direction_h = heuristic_terms(new_node, new_pos)
+                    priority = new_cost + distance_h + direction_h
 
-                    heapq.heappush(frontier, (priority, offset, (new_node, new_pos)))
+                    push(frontier, (priority, offset, new_node))
+                    positions[new_node] = new_pos
                     backtrack[new_node] = (current_node, c)
                     cost[new_node] = new_cost
 
@@ -271,11 +295,13 @@ class ModifiedAStar:
         commands = []
         curr = goal_node
 
-        while curr:
-            curr, c = backtrack.get(curr, (None, None))
-            if c:
-                commands.append(c)
+        # Every node on the chain is in backtrack, ending at the start node's (None, None)
+        while curr is not None:
+            curr, c = backtrack[curr]
+            if c is not None:
+                commands.append(copy.copy(c))
 
+        # An in-place reverse of the short command list is cheaper than building it front first
         commands.reverse()
 
         if flag:
@@ -0,0 +1,213 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+
+# Smallest 2-opt gain accepted, so floating point noise cannot cause endless reversals
+_EPSILON = 1e-9
+
+
+def path_distance(dmat: np.ndarray, path: Sequence[int]) -> float:
+    """
+    Total cost of visiting obstacles in order, starting from the robot start node.
+
+    Args:
+        dmat: (N + 1, N + 1) distance matrix where node 0 is the start and node i + 1 is obstacle i
+        path: Obstacle indices in visiting order
+
+    Returns:
+        Sum of the edge costs along the path (inf if any edge is unreachable)
+    """
+    if len(path) == 0:
+        return 0.0
+    if len(path) == 1:
+        return float(dmat[0, path[0] + 1])
+
+    # Shift obstacle indices past the start node, then add the start edge to the
+    # gathered edges between consecutive obstacles
+    nodes = np.asarray(path, dtype=np.intp) + 1
+    return float(dmat[0, nodes[0]] + dmat[nodes[:-1], nodes[1:]].sum())
+
+
+def population_distances(dmat: np.ndarray, population: np.ndarray) -> np.ndarray:
+    """
+    Total cost of every path in a population at once.
+
+    Args:
+        dmat: Distance matrix as for path_distance
+        population: (P, N) integer array with one obstacle visiting order per row
+
+    Returns:
+        Array of P path costs (inf where a path uses an unreachable edge)
+    """
+    # Same gather as path_distance, batched over rows
+    nodes = population + 1
+    return dmat[0, nodes[:, 0]] + dmat[nodes[:, :-1], nodes[:, 1:]].sum(axis=1)
+
+
+def population_fitness(dmat: np.ndarray, population: np.ndarray) -> np.ndarray:
+    """
+    GA fitness of every path in a population at once: higher is better, and unreachable paths score 0.
+
+    Args:
+        dmat: Distance matrix as for path_distance
+        population: (P, N) integer array with one obstacle visiting order per row
+
+    Returns:
+        Array of P scores, 1 / (1 + distance) per path
+    """
+    # An infinite distance yields exactly 0.0 here, with no special case needed
+    return 1.0 / (1.0 + population_distances(dmat, population))
+
+
+def nearest_neighbor_paths(dmat: np.ndarray, starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedy nearest neighbour paths from several first obstacles, built in lockstep.
+
+    Every start takes its next step in the same vectorized argmin, so all starts
+    together cost N array operations rather than N Python loops each. Ties go to the
+    lowest obstacle index.
+
+    Args:
+        dmat: Distance matrix as for path_distance
+        starts: Obstacle index each path begins at
+
+    Returns:
+        (paths, complete): a (len(starts), N) array of visiting orders, and a mask of the
+        paths that reached every obstacle without needing an unreachable edge
+    """
+    size = dmat.shape[0] - 1
+    rows = np.arange(len(starts))
+    obstacle_dmat = dmat[1:, 1:]
+
+    paths = np.empty((len(starts), size), dtype=np.intp)
+    paths[:, 0] = starts
+    visited = np.zeros((len(starts), size), dtype=bool)
+    visited[rows, starts] = True
+    complete = np.ones(len(starts), dtype=bool)
+
+    current = paths[:, 0]
+    for step in range(1, size):
+        distances = np.where(visited, np.inf, obstacle_dmat[current])
+        nearest = np.argmin(distances, axis=1)
+        complete &= np.isfinite(distances[rows, nearest])
+
+        paths[:, step] = nearest
+        visited[rows, nearest] = True
+        current = nearest
+
+    return paths, complete
+
+
+def two_opt(dmat: np.ndarray, path: Sequence[int], max_iter: int = 100) -> np.ndarray:
+    """
+    Improve a path with 2-opt segment reversals until no reversal helps.
+
+    Takes the first improving reversal found and rescans, for at most max_iter passes.
+    Each candidate is scored by the change in its two boundary edges alone, which
+    relies on dmat being symmetric so the reversed segment's internal cost is unchanged.
+
+    Args:
+        dmat: Distance matrix as for path_distance
+        path: Obstacle indices in visiting order
+        max_iter: Maximum number of improving passes
+
+    Returns:
+        Integer array with the improved visiting order
+    """
+    size = len(path)
+    if size < 3:
+        return np.array(path, dtype=np.intp)
+
+    if path_distance(dmat, path) == float('inf'):
+        return np.array(path, dtype=np.intp)
+
+    # Work on dmat node indices with the start node anchored in front, so reversing
+    # tour[p..q] for p >= 1 covers every reversal of the original path
+    tour = [0] + [index + 1 for index in path]
+    last = size
+
+    for _ in range(max_iter):
+        improved = False
+
+        for p in range(1, last + 1):
+            a, b = tour[p - 1], tour[p]
+            for q in range(p + 2, last + 1):
+                c = tour[q]
+                delta = dmat[a, c] - dmat[a, b]
+                if q < last:
+                    d = tour[q + 1]
+                    delta += dmat[b, d] - dmat[c, d]
+
+                if delta < -_EPSILON:
+                    tour[p:q + 1] = tour[p:q + 1][::-1]
+                    improved = True
+                    break
+            if improved:
+                break
+
+        if not improved:
+            break
+
+    return np.array(tour[1:], dtype=np.intp) - 1
+
+
+def held_karp(dmat: np.ndarray) -> np.ndarray:
+    """
+    Exact shortest path from the start node through every obstacle, by bitmask DP.
+
+    Runs in O(N^2 * 2^N) rather than the O(N * N!) of trying every permutation. Among
+    equally short paths the lexicographically smallest is returned, which is the one
+    min() over itertools.permutations would pick.
+
+    Args:
+        dmat: Distance matrix as for path_distance
+
+    Returns:
+        Integer array with the optimal visiting order of obstacle indices
+    """
+    size = dmat.shape[0] - 1
+    if size == 0:
+        return np.empty(0, dtype=np.intp)
+
+    full = (1 << size) - 1
+    masks = np.arange(1 << size)
+    popcount = np.zeros(1 << size, dtype=np.intp)
+    for bit in range(size):
+        popcount += (masks >> bit) & 1
+
+    # remaining[mask, last] is the cheapest way to visit every obstacle outside mask,
+    # having visited mask and currently standing at obstacle last
+    remaining = np.full((1 << size, size), np.inf)
+    remaining[full] = 0.0
+    obstacle_dmat = dmat[1:, 1:]
+
+    for count in range(size - 1, 0, -1):
+        level = masks[popcount == count]
+        best = remaining[level]
+        for j in range(size):
+            without_j = level[(level >> j) & 1 == 0]
+            rows = np.searchsorted(level, without_j)
+            candidate = obstacle_dmat[:, j][None, :] + remaining[without_j | (1 << j), j][:, None]
+            best[rows] = np.minimum(best[rows], candidate)
+        remaining[level] = best
+
+    # With every path unreachable there is nothing to optimise; keep the natural order
+    if not np.isfinite(np.min(dmat[0, 1:] + remaining[1 << np.arange(size), np.arange(size)])):
+        return np.arange(size, dtype=np.intp)
+
+    # Walk forwards taking the smallest next obstacle that stays on an optimal path
+    path = []
+    mask = 0
+    current = 0
+    for _ in range(size):
+        candidates = [j for j in range(size) if not (mask >> j) & 1]
+        totals = [dmat[current, j + 1] + remaining[mask | (1 << j), j] for j in candidates]
+        target = min(totals)
+        for j, total in zip(candidates, totals):
+            if total <= target + _EPSILON:
+                break
+        path.append(j)
+        mask |= 1 << j
+        current = j + 1
+
+    return np.array(path, dtype=np.intp)
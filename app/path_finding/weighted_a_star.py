@@ -1,4 +1,4 @@
-from queue import PriorityQueue
+import heapq
 from typing import List, Tuple, Optional, Dict, Any
 
 from commands.command import Command
@@ -6,7 +6,7 @@ from commands.go_straight_command import StraightCommand
 from commands.turn_command import TurnCommand
 from misc.positioning import RobotPosition
 from misc.type_of_turn import TypeOfTurn
-from path_finding.modified_a_star import ModifiedAStar
+from path_finding.modified_a_star import ModifiedAStar, pack_node
 
 
 class WeightedAStar(ModifiedAStar):
@@ -85,20 +85,18 @@ class WeightedAStar(ModifiedAStar):
 
         return self.DEFAULT_WEIGHT
 
-    def _is_goal_reached(self, current_node: Tuple, goal_node: Tuple) -> bool:
+    def _is_goal_reached(self, current_node: int, goal_node: int) -> bool:
         """
         Check if the current node matches the goal node (position and direction).
 
         Args:
-            current_node: Current node (x, y, direction)
-            goal_node: Goal node (x, y, direction)
+            current_node: Current packed node
+            goal_node: Goal packed node
 
         Returns:
             True if goal is reached, False otherwise
         """
-        return (current_node[0] == goal_node[0] and
-                current_node[1] == goal_node[1] and
-                current_node[2] == goal_node[2])
+        return current_node == goal_node
 
     def start_weighted_astar(self, flag) -> Tuple[Optional[RobotPosition], List[Command]]:
         """
@@ -110,44 +108,56 @@ class WeightedAStar(ModifiedAStar):
         Returns:
             Tuple of (final_position, command_list) or (None, []) if no path found
         """
-        frontier = PriorityQueue()
-        backtrack: Dict[Tuple, Tuple[Optional[Tuple], Optional[Command]]] = {}
-        cost: Dict[Tuple, int] = {}
+        # Plain heap list: the search is single-threaded, so PriorityQueue's locking is pure overhead
+        frontier = []
+        backtrack: Dict[int, Tuple[Optional[int], Optional[Command]]] = {}
+        cost: Dict[int, int] = {}
+        expanded: Dict[int, int] = {}  # Cost of each node when its neighbours were last relaxed
 
-        # Set up goal and start nodes
-        goal_node = self.end.xy()
-        goal_node_with_dir = goal_node + (self.end.direction,)
-
-        start_node = self.start.xy()
-        start_node_with_dir = start_node + (self.start.direction,)
+        # Set up goal and start nodes, as (x, y, direction) packed into an int
+        goal_node_with_dir = pack_node(self.end.x, self.end.y, self.end.direction)
+        start_node_with_dir = pack_node(self.start.x, self.start.y, self.start.direction)
 
         # Initialize search
         offset = 0
-        frontier.put((0, offset, (start_node_with_dir, self.start)))
+        heapq.heappush(frontier, (0, offset, start_node_with_dir))
         cost[start_node_with_dir] = 0
         backtrack[start_node_with_dir] = (None, None)
+        # Robot position of each node, so frontier entries only need to carry the node key
+        positions = {start_node_with_dir: self.start}
+
+        # Bound methods used in the loop are looked up once
+        push, pop = heapq.heappush, heapq.heappop
+        cost_get, expanded_get = cost.get, expanded.get
+        heuristic_terms, cached_neighbours, get_weight = self.heuristic_terms, self.cached_neighbours, self.get_weight
 
-        while not frontier.empty():
-            priority, _, (current_node, current_position) = frontier.get()
+        while frontier:
+            priority, _, current_node = pop(frontier)
+            current_position = positions[current_node]
 
             # Check if we've reached the goal
             if self._is_goal_reached(current_node, goal_node_with_dir):
                 commands = self.extract_commands(backtrack, goal_node_with_dir, flag)
                 return current_position, commands
 
+            # Skip stale entries: if the node was already expanded at its current cost,
+            # expanding it again cannot improve any neighbour
+            current_cost = cost[current_node]
+            if expanded_get(current_node, self.INFINITY) <= current_cost:
+                continue
+            expanded[current_node] = current_cost
+
             # Explore neighbors
-            neighbors = self.get_neighbours(current_position)
-            for new_node, new_pos, command_weight, command in neighbors:
-                new_cost = cost.get(current_node, 0) + command_weight
+            for new_node, new_pos, command_weight, command in cached_neighbours(current_node, current_position):
+                new_cost = current_cost + command_weight
 
-                if new_cost < cost.get(new_node, self.INFINITY):
+                if new_cost < cost_get(new_node, self.INFINITY):
                     offset += 1
-                    priority = (new_cost +
-                                self.distance_heuristic(new_pos) +
-                                self.direction_heuristic(new_pos) +
-                                self.get_weight(command))
+                    distance_h, direction_h = heuristic_terms(new_node, new_pos)
+                    priority = new_cost + distance_h + direction_h + get_weight(command)
 
-                    frontier.put((priority, offset, (new_node, new_pos)))
+                    push(frontier, (priority, offset, new_node))
+                    positions[new_node] = new_pos
                     backtrack[new_node] = (current_node, command)
                     cost[new_node] = new_cost
 
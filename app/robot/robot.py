@@ -6,6 +6,7 @@ import pygame
 import constants as constants
 import misc.timer as timer
 from commands.go_straight_command import StraightCommand
+from commands.simulation import command_end_frames, simulate_trajectory
 from commands.turn_command import TurnCommand
 from misc.direction import Direction
 from misc.positioning import RobotPosition
@@ -48,6 +49,25 @@ class Robot:
         # Command execution state
         self._current_command_index = 0
         self._total_time_printed = False
+        self._reset_trajectory()
+
+    def _reset_trajectory(self) -> None:
+        """Drop the precomputed frame trajectory so it is rebuilt on the next simulated frame."""
+        self._trajectory = None
+        self._command_end_frames = None
+        self._frame = 0
+
+    def _build_trajectory(self) -> None:
+        """
+        Precompute every simulation frame for the planned commands from the current position.
+
+        Only called before the first command runs, while the robot is still at the pose the
+        commands were planned from.
+        """
+        commands = list(self.hamiltonian.commands)
+        self._trajectory = simulate_trajectory(commands, self.pos)
+        self._command_end_frames = command_end_frames(commands)
+        self._frame = 0
 
     def get_current_pos(self) -> RobotPosition:
         """Get the current robot position."""
@@ -96,6 +116,7 @@ class Robot:
         self.path_history.clear()
         self._current_command_index = 0
         self._total_time_printed = False
+        self._reset_trajectory()
 
     def convert_commands_to_messages(self) -> List[str]:
         """
@@ -167,23 +188,40 @@ class Robot:
                 current_pygame_pos != self.path_history[-1]):
             self.path_history.append(current_pygame_pos)
 
-    def _execute_current_command(self) -> None:
-        """Execute one tick of the current command."""
+    def _execute_current_command(self, do: bool = True) -> None:
+        """
+        Execute one tick of the current command.
+
+        Args:
+            do: If False, only the end state is needed so the whole command is applied at once
+        """
         if self._current_command_index >= len(self.hamiltonian.commands):
             return
 
         current_command = self.hamiltonian.commands[self._current_command_index]
 
-        # Skip commands with zero ticks
-        if current_command.total_ticks == 0:
+        # Built before any command has moved the robot, so the trajectory starts from the pose
+        # the planned commands start from whichever update mode runs first
+        if self._trajectory is None:
+            self._build_trajectory()
+
+        if not do:
+            # Jump the frame counter to the command's end along with the pose, so a later
+            # per-frame update carries on from the next command rather than replaying this one
+            current_command.apply_final(self)
+            self._frame = int(self._command_end_frames[self._current_command_index])
             self._current_command_index += 1
+            self._check_all_commands_completed()
             return
 
-        # Process one tick of the command
-        current_command.process_one_tick(self)
+        # Each frame is a single countdown step into the precomputed trajectory
+        self._frame += 1
+        x, y, direction = self._trajectory[self._frame]
+        self.pos.x, self.pos.y, self.pos.direction = x, y, Direction(int(direction))
 
         # Check if command is completed
-        if current_command.ticks <= 0:
+        if self._frame >= self._command_end_frames[self._current_command_index]:
+            current_command.ticks = 0
             print(f"Finished processing {current_command}, {self.pos}")
             self._current_command_index += 1
             self._check_all_commands_completed()
@@ -199,11 +237,14 @@ class Robot:
             self._total_time_printed = True
             timer.Timer.end_timer()
 
-    def update(self) -> None:
+    def update(self, do: bool = True) -> None:
         """
         Update robot state for one frame.
 
         Updates path history and executes current command if available.
+
+        Args:
+            do: If False, skip per-frame simulation and apply the current command's end state
         """
         self._update_path_history()
-        self._execute_current_command()
\ No newline at end of file
+        self._execute_current_command(do)
\ No newline at end of file
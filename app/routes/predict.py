@@ -1,28 +1,72 @@
+import asyncio
 import debugpy
 import os
-import yaml
+from config import get_cfg
 from pathlib import Path
+from typing import List
 from PIL import Image
 from fastapi import APIRouter, UploadFile, File, Request, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response
 from services.model_predict import *
 from services.pathing_algo import *
-router = APIRouter()
+from services.batcher import RequestBatcher
+
+# Serialize JSON responses with orjson when it is installed, else FastAPI's default encoder
+try:
+    import orjson  # noqa: F401  (ORJSONResponse needs it at render time)
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
+
+router = APIRouter(default_response_class=DefaultResponse)
 
 # ------------------------ LOAD CONFIGS --------------------------------
-# load variables from config file into the environment
-with open("app/config.yaml", "r") as f:   # adjust path if config.yaml is elsewhere
-    cfg = yaml.safe_load(f)
+# load variables from config file (parsed once and shared between modules)
+cfg = get_cfg()
 
 PREDICTIONS_DIR = cfg.get("predictions_dir", "outputs/predictions")
 
+# Models served by /image: the primary model, and the one retried when it detects nothing
+PRIMARY_MODEL_PATH = "models/task1/task1.pt"
+FALLBACK_MODEL_PATH = "models/task1/bestv2.pt"
+
+def warm_up_models() -> None:
+    """Load and warm up every served model, so the first requests do not pay for it."""
+    # /predict-json serves MODEL_PATH, which is usually the primary model too
+    for model_path in dict.fromkeys((PRIMARY_MODEL_PATH, FALLBACK_MODEL_PATH, MODEL_PATH)):
+        try:
+            warm_up_model(model_path)
+        except Exception as e:
+            # A missing model only affects its own endpoints, which report the error per request
+            print(f"⚠️ Could not warm up {model_path}: {e}")
+
+# ------------------------ REQUEST BATCHING --------------------------------
+# Concurrent prediction requests share one inference call per batch
+_json_batcher = RequestBatcher(model_predict_batch, MAX_BATCH_SIZE, MAX_BATCH_WAIT)
+_download_batchers = {}
+
+def _download_batcher(model_path: str) -> RequestBatcher:
+    """Batcher for model_predict_download requests on one model."""
+    batcher = _download_batchers.get(model_path)
+    if batcher is None:
+        batcher = RequestBatcher(
+            lambda images: model_predict_download_batch(images, model_path=model_path),
+            MAX_BATCH_SIZE, MAX_BATCH_WAIT
+        )
+        _download_batchers[model_path] = batcher
+    return batcher
+
+# Annotated images are written in worker threads, at most this many at a time
+_file_writes = asyncio.Semaphore(8)
+
 # ----------------------- TEST APIS --------------------------------------------------
 @router.post("/path-test")
 async def get_prediction_path_with_coordinates_test(raw_data: str):
 
     print(f"Raw data received at /path endpoint: {raw_data}")
     from services.pathing_algo import run_minimal_with_coordinates
-    commands_with_coords = run_minimal_with_coordinates(raw_data)
+    # Path planning is CPU-bound, so it runs in a worker thread rather than on the event loop
+    commands_with_coords = await asyncio.to_thread(run_minimal_with_coordinates, raw_data)
     
     # Format the response to include both commands and coordinates
     formatted_response = []
@@ -76,21 +120,36 @@ async def get_prediction_path_with_coordinates_test(raw_data: str):
 async def predict(file: UploadFile = File(...)):
     try:
         contents = await file.read()
-        results = model_predict(contents)
+        results = await _json_batcher.submit(contents)
         return results
 
     except Exception as e:
         print("❌ Internal server error:", e)
         return {"error": str(e)}
 
+# This endpoint handles several image uploads at once and returns predictions per file name as JSON
+@router.post("/predict-batch")
+async def predict_batch(files: List[UploadFile] = File(...)):
+    try:
+        contents = await asyncio.gather(*(file.read() for file in files))
+        # One inference call covers every uploaded image
+        results = await asyncio.to_thread(model_predict_batch, list(contents))
+        # One entry per upload, in upload order; filenames are not unique (the Pi sends image.jpg)
+        return [{"filename": file.filename, **result} for file, result in zip(files, results)]
+
+    except Exception as e:
+        print("❌ Internal server error:", e)
+        return {"error": str(e)}
+
 # This endpoint handles image uploads and returns the image with predictions for download
 @router.post("/predict-download-test")
 async def predict_download_image(file: UploadFile = File(...)):
     contents = await file.read()
-    buffer, filename, predictions = model_predict_download(contents)
+    buffer, filename, predictions = await asyncio.to_thread(model_predict_download, contents)
 
-    return StreamingResponse(
-        buffer,
+    # The whole JPEG is already in memory, so send it as one body rather than streaming it
+    return Response(
+        content=bytes(buffer),
         media_type="image/jpeg",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"'
@@ -113,17 +172,18 @@ async def test():
 async def predict_save_image(file: UploadFile = File(...)):
     print("Request Received To Predict Image.")
     contents = await file.read()
-    buffer, filename, predictions = model_predict_download(contents, model_path="models/task1/task1.pt")
+    buffer, filename, predictions = await _download_batcher(PRIMARY_MODEL_PATH).submit(contents)
     # If no predictions detected, use a different model
     if not predictions['predictions']:
         print("No predictions detected, using alternative model...")
-        buffer, filename, predictions = model_predict_download(contents, model_path="models/task1/bestv2.pt")
+        buffer, filename, predictions = await _download_batcher(FALLBACK_MODEL_PATH).submit(contents)
     
     print("Image prediction completed")
     # ---- Save file to server directory ----
+    # Written off the event loop, but awaited so /stitch always sees every saved image
     save_path = os.path.join(PREDICTIONS_DIR, filename)
-    with open(save_path, "wb") as f:
-        f.write(buffer.getbuffer())  # buffer is BytesIO, so use getbuffer()
+    async with _file_writes:
+        await asyncio.to_thread(Path(save_path).write_bytes, buffer)  # buffer is bytes-like, so it is written without a copy
     print("Predicted image saved to server as ", filename)
     
     return predictions
@@ -147,7 +207,8 @@ async def get_prediction_path_with_coordinates(request: Request):
 
     print(f"Raw data received at /path endpoint: {raw_data}")
     from services.pathing_algo import run_minimal_with_coordinates
-    commands_with_coords = run_minimal_with_coordinates(raw_data)
+    # Path planning is CPU-bound, so it runs in a worker thread rather than on the event loop
+    commands_with_coords = await asyncio.to_thread(run_minimal_with_coordinates, raw_data)
     
     # Format the response to include both commands and coordinates
     formatted_response = []
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Callable, List, Optional
+
+
+class RequestBatcher:
+    """
+    Fuse concurrent requests into single calls of a blocking batch function.
+
+    Each request submits one item and awaits its own result. A background task
+    collects up to max_batch_size queued items, waiting at most max_wait seconds
+    after the first one for more to arrive, then runs the batch function on them
+    in a worker thread so the event loop keeps serving other requests.
+    """
+
+    def __init__(self, run_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 8,
+                 max_wait: float = 0.02):
+        """
+        Args:
+            run_batch: Blocking function mapping a list of items to a list of results, in order
+            max_batch_size: Most items handed to run_batch at once
+            max_wait: Seconds to hold the first item of a batch while more arrive
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        # Created on first use, so they belong to the event loop serving requests
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result, re-raising any error from its batch."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._serve())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect_batch(self) -> list:
+        """Wait for one queued request, then take more until the batch is full or the wait is over."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _serve(self) -> None:
+        while True:
+            batch = await self._collect_batch()
+            try:
+                results = await asyncio.to_thread(self.run_batch, [item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    _, future = batch[0]
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    # One bad item (e.g. a corrupt upload) must not fail the requests batched
+                    # with it, so rerun them one by one and give each its own outcome
+                    for entry in batch:
+                        await self._serve_one(*entry)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                # A request whose client went away has already cancelled its future
+                if not future.done():
+                    future.set_result(result)
+
+    async def _serve_one(self, item: Any, future: asyncio.Future) -> None:
+        """Run a single item as a batch of one, settling its future with the result or error."""
+        if future.done():
+            return
+        try:
+            result = (await asyncio.to_thread(self.run_batch, [item]))[0]
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
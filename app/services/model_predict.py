@@ -1,19 +1,27 @@
 import io, uuid, os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import debugpy
 import cv2
 import numpy as np
 from dotenv import load_dotenv
-import yaml
+from config import get_cfg
 import torch
 import json
-from PIL import Image, ImageOps
+from PIL import Image
 from pathlib import Path
+from typing import Dict, List, Optional
 from ultralytics import YOLO
-from ultralytics.engine.results import Boxes
 
-# load variables from config file into the environment
-with open("app/config.yaml", "r") as f:   # adjust path if config.yaml is elsewhere
-    cfg = yaml.safe_load(f)
+# Optional libjpeg-turbo codec; JPEGs fall back to PIL / cv2 when the package or library is missing
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_RGB, TJSAMP_420
+    _TJ = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _TJ = None
+
+# load variables from config file (parsed once and shared between modules)
+cfg = get_cfg()
 
 # --- config / one-time load ---
 MODEL_PATH = cfg["model"]   # Model name
@@ -23,33 +31,114 @@ DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 IMG_SIZE = int(cfg.get("imgsz", 640))
 CONF = float(cfg.get("conf", 0.5))
 IOU = float(cfg.get("iou", 0.5))
-JPEG_QUALITY = int(cfg.get("jpeg_quality", 95))
+JPEG_QUALITY = int(cfg.get("jpeg_quality", 85))
 LINE_WIDTH = int(cfg.get("line_width", 2))
 FONT_SIZE = int(cfg.get("font_size", 5))
 MIN_AREA = int(cfg.get("min_area", 3200))  # minimum area (in pixels) for valid detection box
+# Detections NMS keeps per image on the download path, by confidence; the largest box is picked
+# from these, so a value below the Ultralytics default of 300 trades accuracy for NMS time
+DOWNLOAD_MAX_DET = int(cfg.get("download_max_det", 300))
+# Counter-clockwise rotation applied to every upload to undo the camera mounting
+CAMERA_ROTATION = int(cfg.get("camera_rotation", 180))
+if CAMERA_ROTATION not in (0, 90, 180, 270):
+    raise ValueError(f"camera_rotation must be 0, 90, 180 or 270, got {CAMERA_ROTATION}")
 DEVICE = "cuda:0" if torch.cuda.is_available() else "cpu"
+# FP16 inference on CUDA unless config.yaml turns it off; CPUs stay at FP32
+HALF = DEVICE.startswith("cuda") and bool(cfg.get("half", True))
+# Let cuDNN pick the fastest kernels for the input shapes, which repeat from frame to frame
+torch.backends.cudnn.benchmark = DEVICE.startswith("cuda")
+# Dynamic batching of concurrent requests: largest batch, and longest wait for it to fill
+MAX_BATCH_SIZE = int(cfg.get("max_batch_size", 8))
+MAX_BATCH_WAIT = float(cfg.get("max_batch_wait_ms", 20)) / 1000
 
-def _bytes_to_rgb_numpy(image_bytes: bytes) -> np.ndarray:
-    """Decode bytes -> contiguous uint8 RGB HxWx3, with EXIF orientation fixed."""
-    img = Image.open(io.BytesIO(image_bytes))
-    img = ImageOps.exif_transpose(img).convert("RGB")  # handle orientation + force RGB
+# Export a TensorRT engine for models that lack one on first load (CUDA hosts only)
+BUILD_ENGINE = bool(cfg.get("build_engine", False))
 
-    # Flip image 180 degrees for camera orientation
-    flipped_img = img.rotate(180) 
-    arr = np.asarray(flipped_img, dtype=np.uint8)
+# Loaded models shared by every request, by weights path
+_MODELS: Dict[str, YOLO] = {}
 
-    # Dont flip image 180 degrees for camera orientation
-    # arr = np.asarray(img, dtype=np.uint8)
+def _get_model(model_path: str) -> YOLO:
+    """
+    Load a model on first use and keep it for later requests.
 
-    return np.ascontiguousarray(arr)
+    On CUDA hosts a TensorRT engine exported next to the weights (see src/export_engine.py)
+    is loaded instead of the .pt, when one exists. With build_engine set in config.yaml, a
+    missing engine is exported first; startup warm-up does this before serving requests.
+    """
+    model = _MODELS.get(model_path)
+    if model is None:
+        engine_path = Path(model_path).with_suffix(".engine")
+        if DEVICE.startswith("cuda") and BUILD_ENGINE and not engine_path.exists():
+            print(f"Exporting TensorRT engine for {model_path}, this takes a few minutes...")
+            YOLO(model_path).export(format="engine", half=HALF, imgsz=IMG_SIZE, dynamic=True,
+                                    batch=MAX_BATCH_SIZE, device=DEVICE)
+        if DEVICE.startswith("cuda") and engine_path.exists():
+            # Engines are bound to their device at export, so they are not moved with .to()
+            model = YOLO(str(engine_path), task="detect")
+        else:
+            model = YOLO(model_path).to(DEVICE)
+        _MODELS[model_path] = model
+    return model
 
-# Function to handle image prediction and return annotated image for download
-def model_predict_download(image_bytes: bytes, returnJSON: bool = False, model_path: str = MODEL_PATH):
+def clear_model_cache() -> None:
+    """Drop every loaded model, so the next request reloads its weights from disk."""
+    _MODELS.clear()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
 
-    print('Using model located in', model_path)
-    # Load in model
-    model = YOLO(model_path).to(DEVICE)
+def _bytes_to_rgb_numpy(image_bytes: bytes, min_side: Optional[int] = None) -> np.ndarray:
+    """
+    Decode bytes -> contiguous uint8 RGB HxWx3, rotated by CAMERA_ROTATION.
+
+    With min_side, JPEGs are decoded at the smallest DCT scale (1/2, 1/4 or 1/8) that keeps
+    both sides at least min_side pixels, skipping pixels the model would only downsample away.
+    """
+    if _TJ is not None and image_bytes[:2] == b"\xff\xd8":
+        scaling_factor = None
+        if min_side:
+            width, height, _, _ = _TJ.decode_header(image_bytes)
+            scaling_factor = next(((1, d) for d in (8, 4, 2) if min(width, height) // d >= min_side), None)
+        # libjpeg-turbo decodes straight to an RGB array
+        arr = _TJ.decode(image_bytes, pixel_format=TJPF_RGB, scaling_factor=scaling_factor)
+    else:
+        # PNG and other formats, or JPEGs without libjpeg-turbo
+        img = Image.open(io.BytesIO(image_bytes))
+        if min_side:
+            # PIL's JPEG draft mode picks the same DCT scale; other formats ignore it
+            img.draft("RGB", (min_side, min_side))
+        arr = np.asarray(img.convert("RGB"), dtype=np.uint8)
+
+    # Undo the fixed camera mounting as a rotated view copied out once. EXIF orientation is
+    # not applied, as the mounting alone decides how the frames are turned.
+    return np.ascontiguousarray(np.rot90(arr, CAMERA_ROTATION // 90))
+
+def _encode_jpeg(img_bgr: np.ndarray):
+    """
+    Encode a BGR image as JPEG at JPEG_QUALITY with 4:2:0 chroma subsampling.
 
+    Returns bytes, or a memoryview over cv2's output buffer, so the payload is never copied.
+    """
+    if _TJ is not None:
+        return _TJ.encode(img_bgr, quality=JPEG_QUALITY, pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+
+    ok, buf = cv2.imencode(".jpg", img_bgr, [
+        int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY,
+        int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR), int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420),
+    ])
+    if not ok:
+        raise RuntimeError("Failed to encode JPEG")
+    return memoryview(buf)
+
+def warm_up_model(model_path: str = MODEL_PATH) -> None:
+    """Load a model and run it on a blank frame, so CUDA setup and cuDNN autotuning happen before the first request."""
+    model = _get_model(model_path)
+    blank = np.zeros((IMG_SIZE, IMG_SIZE, 3), dtype=np.uint8)
+    # The first call initialises the device kernels, the second fills the cuDNN benchmark cache
+    for _ in range(2):
+        _predict(model, blank)
+
+def _prepare_download_input(image_bytes: bytes):
+    """Decode an upload, returning (RGB image for annotation, 3-channel grayscale model input)."""
     # 1) Decode bytes to numpy
     img_rgb = _bytes_to_rgb_numpy(image_bytes)            # (H,W,3) RGB
     
@@ -57,138 +146,169 @@ def model_predict_download(image_bytes: bytes, returnJSON: bool = False, model_p
     img_rgb_gray = cv2.cvtColor(img_rgb, cv2.COLOR_RGB2GRAY)
     img_rgb_gray2 = cv2.cvtColor(img_rgb_gray, cv2.COLOR_GRAY2RGB)
 
-    # 2) Inference (Ultralytics accepts numpy arrays directly)
-    res = model.predict(
-        source=img_rgb_gray2,
-        conf=CONF,
-        iou=IOU,
-        imgsz=IMG_SIZE,
-        device=DEVICE,
-        verbose=False,
-    )[0]
+    return img_rgb, img_rgb_gray2
 
-    detectionBoxs = res.boxes
-    
-    # Filter out detections with less than MIN_AREA
-    if len(detectionBoxs) > 0:
-        print(f"Filtering out detection boxes with area less than {MIN_AREA} pixels...")
-        areas = detectionBoxs.xywh[:, 2] * detectionBoxs.xywh[:, 3]
+# Requests run inference from worker threads; one call at a time keeps the GPU from thrashing
+# between contexts, and Ultralytics predictors are not safe to share between threads
+_INFERENCE_LOCK = threading.Lock()
 
-        # Boolean mask for detections above threshold
-        mask = areas >= MIN_AREA
+def _predict(model, sources, max_det: int = 300):
+    """Run one inference call over a single image or a list of images, returning one result per image."""
+    # Ultralytics accepts numpy arrays, and lists of them, directly
+    with _INFERENCE_LOCK:
+        return model.predict(
+            source=sources,
+            conf=CONF,
+            iou=IOU,
+            imgsz=IMG_SIZE,
+            device=DEVICE,
+            half=HALF,
+            max_det=max_det,
+            verbose=False,
+        )
 
-        # keep only detectionBoxes with area >= MIN_AREA
-        detectionBoxs = detectionBoxs[mask]
-
-        # Reassign filtered boxes back to result
-        res.boxes = detectionBoxs
-    
-    # Filter out all detections less the one with the largest bounding box
-    if len(detectionBoxs) >= 2:
-        print("More than 1 object detected in the image....selecting closer object")
-        # Compute area for each detection
+def _finish_download(res, img_rgb: np.ndarray):
+    """Filter the detections of one result, then render and encode the annotated image."""
+    # Keep only the closest object, taken to be the largest detection box, and only if its
+    # area reaches MIN_AREA. This is what filtering by MIN_AREA and then keeping the largest
+    # survivor gives, with the areas computed once.
+    detectionBoxs = res.boxes
+    if len(detectionBoxs) > 0:
         areas = detectionBoxs.xywh[:, 2] * detectionBoxs.xywh[:, 3]
-        # Find index of largest area
         largest_idx = int(torch.argmax(areas))
 
-        # Keep only that detection
-        largest_box_data = res.boxes.data[largest_idx].unsqueeze(0)  # tensor shape (1,6)
-        res.boxes = Boxes(largest_box_data, res.boxes.orig_shape)    # reconstruct single-box object
-
+        if float(areas[largest_idx]) >= MIN_AREA:
+            if len(detectionBoxs) >= 2:
+                print("More than 1 object detected in the image....selecting closer object")
+            res.boxes = detectionBoxs[largest_idx:largest_idx + 1]   # slicing keeps a Boxes object
+        else:
+            print(f"Filtering out detection boxes with area less than {MIN_AREA} pixels...")
+            res.boxes = detectionBoxs[:0]
 
     # 3) Render annotated image (BGR numpy)
-    res.orig_img = img_rgb.copy() # Restore original image for annotation
+    # Restore original image for annotation. No copy: Results.plot draws on its own copy of it
+    res.orig_img = img_rgb
     annotated_bgr = res.plot(line_width=LINE_WIDTH, font_size=FONT_SIZE)
 
-    # 4) Convert to RGB for saving via PIL (or keep BGR and use cv2.imencode)
-    annotated_bgr = res.plot(line_width=LINE_WIDTH, font_size=FONT_SIZE)
-    ok, buf = cv2.imencode(".jpg", annotated_bgr, [int(cv2.IMWRITE_JPEG_QUALITY), int(JPEG_QUALITY)])
-    if not ok:
-        raise RuntimeError("Failed to encode JPEG")
-
-    buffer = io.BytesIO(buf.tobytes())
-    buffer.seek(0)
+    # 4) Encode the BGR render directly
+    buffer = _encode_jpeg(annotated_bgr)  # bytes-like JPEG payload, no BytesIO wrapper
     filename = f"prediction_{uuid.uuid4().hex[:8]}.jpg"
 
     # 3) Parse results
-    # First path is for default/best model, else statement for backup model
-    if MODEL_PATH == "models/task1/task1.pt":
-        predictions = []
-        for box in res.boxes:
-            cls_id = int(box.cls[0])
-            cls_name = model.names[cls_id] if model.names and cls_id in model.names else str(cls_id)
-            conf = float(box.conf[0])
-            predictions.append({
-                "class_id": cls_id,
-                "image_id": cls_id + 11,
-                "confidence": conf,
-            })
-    else:
-        predictions = []
-        for box in res.boxes:
-            cls_id = int(box.cls[0])
-            cls_name = model.names[cls_id] if model.names and cls_id in model.names else str(cls_id)
-            conf = float(box.conf[0])
-            predictions.append({
-                "class_id": cls_id,
-                "image_id": cls_id + 11,
-                "confidence": conf,
-            })
-
-    predictions = {"predictions": predictions}
+    # One device transfer per column for all detections, as in _parse_predictions
+    class_ids = res.boxes.cls.int().tolist()
+    confidences = res.boxes.conf.tolist()
+    predictions = {"predictions": [
+        {
+            "class_id": cls_id,
+            "image_id": cls_id + 11,
+            "confidence": conf,
+        }
+        for cls_id, conf in zip(class_ids, confidences)
+    ]}
 
     return buffer, filename, predictions
 
+# Function to handle image prediction and return annotated image for download
+@torch.inference_mode()
+def model_predict_download(image_bytes: bytes, returnJSON: bool = False, model_path: str = MODEL_PATH):
+
+    print('Using model located in', model_path)
+    # Load in model (once per path, later requests reuse it)
+    model = _get_model(model_path)
+
+    img_rgb, img_rgb_gray2 = _prepare_download_input(image_bytes)
+
+    # 2) Inference
+    res = _predict(model, img_rgb_gray2, max_det=DOWNLOAD_MAX_DET)[0]
+
+    return _finish_download(res, img_rgb)
+
+# Batched form of model_predict_download: one inference call for every image, one tuple per image
+@torch.inference_mode()
+def model_predict_download_batch(images: List[bytes], model_path: str = MODEL_PATH):
+
+    print(f'Using model located in {model_path} for a batch of {len(images)}')
+    model = _get_model(model_path)
+
+    prepared = [_prepare_download_input(image_bytes) for image_bytes in images]
+    results = _predict(model, [img_rgb_gray2 for _, img_rgb_gray2 in prepared], max_det=DOWNLOAD_MAX_DET)
+
+    return [_finish_download(res, img_rgb) for res, (img_rgb, _) in zip(results, prepared)]
+
+def _parse_predictions(res, model):
+    """Convert the detections of one result into JSON-ready dicts."""
+    # One device transfer per column for all detections, rather than a Boxes object and
+    # two scalar reads per detection
+    class_ids = res.boxes.cls.int().tolist()
+    confidences = res.boxes.conf.tolist()
+    # Looked up once, as model.names is resolved through the wrapped network on every access
+    names = model.names or {}
+
+    return {"predictions": [
+        {
+            "class_id": cls_id,
+            "class_name": names.get(cls_id, str(cls_id)),
+            "confidence": conf,
+        }
+        for cls_id, conf in zip(class_ids, confidences)
+    ]}
+
 # Function to handle image prediction and return results as JSON
 def model_predict(image_bytes: bytes):
-    # 1) Decode bytes to numpy
-    img_rgb = _bytes_to_rgb_numpy(image_bytes)            # (H,W,3) RGB
+    return model_predict_batch([image_bytes])[0]
 
-    # 2) Inference (Ultralytics accepts numpy arrays directly)
-    res = model.predict(
-        source=img_rgb,
-        conf=CONF,
-        iou=IOU,
-        imgsz=IMG_SIZE,
-        device=DEVICE,
-        verbose=False,
-    )[0]
+# Batched form of model_predict: one inference call per batch_size images, one result dict per image.
+# batch_size defaults to MAX_BATCH_SIZE, the largest batch TensorRT engines are exported for
+@torch.inference_mode()
+def model_predict_batch(images: List[bytes], batch_size: int = MAX_BATCH_SIZE):
+    model = _get_model(MODEL_PATH)
 
-    # 3) Parse results
     predictions = []
-    for box in res.boxes:
-        cls_id = int(box.cls[0])
-        cls_name = model.names[cls_id] if model.names and cls_id in model.names else str(cls_id)
-        conf = float(box.conf[0])
-        predictions.append({
-            "class_id": cls_id,
-            "class_name": cls_name,
-            "confidence": conf,
-        })
+    # Chunked so a large upload never decodes or runs every image in one allocation
+    for start in range(0, len(images), batch_size):
+        # 1) Decode bytes to numpy
+        # No boxes are returned here, so large JPEGs can be decoded straight at model resolution
+        sources = [_bytes_to_rgb_numpy(image_bytes, min_side=IMG_SIZE)
+                   for image_bytes in images[start:start + batch_size]]   # (H,W,3) RGB each
+
+        # 2) Inference
+        results = _predict(model, sources)
 
-    return {"predictions": predictions}
+        # 3) Parse results
+        predictions.extend(_parse_predictions(res, model) for res in results)
+
+    return predictions
+
+def _load_rgb(path: Path) -> np.ndarray:
+    """Decode an image file to a uint8 RGB HxWx3 array."""
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
 
 def stitch_img():
     # Resolve paths
     image_files = sorted(Path(PREDICTIONS_DIR).glob("*.jpg"))
-    filename = image_files[0].stem + "_stitched.jpg"
-    save_path = os.path.join(STITCHED_DIR, filename)
     
     if not image_files:
         raise FileNotFoundError("No images found in outputs directory")
 
-    # open images
-    images = [Image.open(img) for img in image_files]
+    filename = image_files[0].stem + "_stitched.jpg"
+    save_path = os.path.join(STITCHED_DIR, filename)
+
+    # open images as RGB arrays, decoding the files in parallel (PIL releases the GIL while decoding)
+    with ThreadPoolExecutor() as pool:
+        images = list(pool.map(_load_rgb, image_files))
 
-    # horizontal stitch
-    total_width = sum(img.width for img in images)
-    max_height = max(img.height for img in images)
+    # horizontal stitch: copy each image into its slice of one black canvas, top-aligned
+    total_width = sum(img.shape[1] for img in images)
+    max_height = max(img.shape[0] for img in images)
 
-    stitched = Image.new("RGB", (total_width, max_height))
+    canvas = np.zeros((max_height, total_width, 3), dtype=np.uint8)
     x_offset = 0
     for img in images:
-        stitched.paste(img, (x_offset, 0))
-        x_offset += img.width
+        canvas[:img.shape[0], x_offset:x_offset + img.shape[1]] = img
+        x_offset += img.shape[1]
+    stitched = Image.fromarray(canvas)
     
     # Save to file
     stitched.save(save_path)
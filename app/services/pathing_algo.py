@@ -4,10 +4,11 @@ from typing import List
 import constants
 from commands.go_straight_command import StraightCommand
 from commands.scan_obstacle_command import ScanCommand
+from commands.simulation import apply_commands
 from grid.grid import Grid
 from grid.obstacle import Obstacle
 from misc.direction import Direction
-from misc.positioning import Position
+from misc.positioning import Position, RobotPosition
 from pygame_app import AlgoMinimal
 from robot.robot import Robot
 
@@ -54,6 +55,11 @@ def run_minimal_with_coordinates(raw_data):
 
 
 # ------------------ Helper Functions -----------------------------------
+
+# RPI direction letter -> obstacle angle in degrees
+_DIRECTION_ANGLES = {"N": 90, "S": -90, "E": 0, "W": 180}
+
+
 def parse_rpi_message(message: str) -> List[List[int]]:
         """
         Parse message from RPI in format: ALG:x,y,direction,id;x,y,direction,id;...
@@ -78,8 +84,7 @@ def parse_rpi_message(message: str) -> List[List[int]]:
             y = int(parts[1]) * 10
 
             # Convert direction
-            direction_map = {"N": 90, "S": -90, "E": 0, "W": 180}
-            direction = direction_map.get(parts[2], 0)
+            direction = _DIRECTION_ANGLES.get(parts[2], 0)
 
             obstacle_id = int(parts[3])
             parsed_obstacles.append([x, y, direction, obstacle_id])
@@ -133,21 +138,15 @@ def get_commands_with_coordinates_from_robot(robot):
     Returns:
         List of tuples: [(command_string, estimated_position_after_command), ...]
     """
-    commands_with_coords = []
-    current_pos = robot.pos.copy()  # Start from robot's current position
-    
-    # Iterate through the robot's commands and track position changes
-    for command in robot.hamiltonian.commands:
-        # Apply the command to get new position
-        command.apply_on_pos(current_pos)
-        
-        # Convert command to string format
-        command_str = command.convert_to_message()
-        
-        # Store command string with the position after execution
-        commands_with_coords.append((command_str, current_pos.copy()))
-    
-    return commands_with_coords
+    commands = list(robot.hamiltonian.commands)
+
+    # Positions after every command, starting from the robot's current position
+    positions = apply_commands(commands, robot.pos)[1:].tolist()
+
+    return [
+        (command.convert_to_message(), RobotPosition(x, y, Direction(direction)))
+        for command, (x, y, direction) in zip(commands, positions)
+    ]
 
 def parse_obstacle_data(data: List[List]) -> List[Obstacle]:
     """
@@ -168,7 +167,7 @@ def parse_obstacle_data(data: List[List]) -> List[Obstacle]:
             Position(
                 obstacle_params[0],
                 obstacle_params[1],
-                Direction(obstacle_params[2]),
+                Direction.from_degrees(obstacle_params[2]),
             ),
             obstacle_params[3],
         )
@@ -0,0 +1,42 @@
+import functools
+
+from ultralytics import YOLO
+import yaml
+import sys
+
+@functools.lru_cache(maxsize=None)
+def load_cfg():
+    # load the server config, as the engines are built for the models it serves
+    with open("app/config.yaml", "r") as f:
+        cfg = yaml.safe_load(f)
+
+    return cfg
+
+def main():
+    # --- load config.yaml ---
+    cfg = load_cfg()
+
+    IMGSZ = int(cfg.get("imgsz", 640))
+    BATCH = int(cfg.get("max_batch_size", 8))
+    DEVICE = cfg.get("device", 0)
+
+    # allow overriding from command line: python src/export_engine.py models/task1/task1.pt models/task1/bestv2.pt
+    weights = sys.argv[1:] or [cfg["model"]]
+
+    for path in weights:
+        # FP16 TensorRT engine written next to the weights (task1.pt -> task1.engine), which the
+        # server then loads in place of the .pt on CUDA hosts. Dynamic shapes up to the server's
+        # batch size let batched requests share the engine.
+        engine = YOLO(path).export(
+            format="engine",
+            half=True,
+            imgsz=IMGSZ,
+            dynamic=True,
+            batch=BATCH,
+            workspace=4,
+            device=DEVICE,
+        )
+        print(f"✅ Exported {path} -> {engine}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,13 @@
+import functools
+
 from ultralytics import YOLO
 import yaml
 import sys
 import os
 
+@functools.lru_cache(maxsize=None)
 def load_cfg():
-    # load config
+    # load config once; later calls (e.g. main run repeatedly in-process) reuse the parsed dict
     with open("src/config.yaml", "r") as f:   # adjust path if config.yaml is elsewhere
         cfg = yaml.safe_load(f)
     